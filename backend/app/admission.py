@@ -0,0 +1,162 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from .ollama_pool import configured_node_count
+
+# Engine defaults: a local Ollama box runs a couple of generations at once, Gemini many more.
+# The Ollama concurrency is per server in OLLAMA_BASE_URLS (OLLAMA_LLM_CONCURRENCY_PER_NODE).
+_DEFAULTS = {
+    "ollama": {"concurrency": 2, "queue": 16, "max_wait": 60.0},
+    "gemini": {"concurrency": 8, "queue": 64, "max_wait": 60.0},
+}
+
+class Overloaded(Exception):
+    """Raised instead of queueing when a request would wait too long; maps to an HTTP error."""
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """FIFO admission for LLM calls: ``max_concurrency`` run, up to ``max_queue`` wait.
+
+    A request is rejected up front with 429 when the queue is full and with 503 when the
+    estimated wait (queue position x average generation time) exceeds ``max_wait``; a queued
+    request that is still waiting after ``max_wait`` also gets a 503.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._active = 0
+        self._waiters = deque()
+        self._service_time = None
+        self._stats = {"admitted": 0, "queued": 0, "rejected_full": 0, "rejected_deadline": 0, "timed_out": 0}
+
+    def estimated_wait(self, position: int) -> float:
+        """Seconds until a request at queue ``position`` (1-based) is likely to start."""
+        if not self._service_time:
+            return 0.0
+        return math.ceil(position / self.max_concurrency) * self._service_time
+
+    def _retry_after(self, position: int) -> int:
+        return max(1, math.ceil(self.estimated_wait(position) or self._service_time or 1))
+
+    def queue_position(self) -> int:
+        """Where a request arriving now would wait (1 = next in line), or 0 if it would start at once."""
+        if self._active < self.max_concurrency and not self._waiters:
+            return 0
+        return len(self._waiters) + 1
+
+    def check(self):
+        """Raise :class:`Overloaded` if a request arriving now would be turned away."""
+        if self._active < self.max_concurrency and not self._waiters:
+            return
+        position = len(self._waiters) + 1
+        if len(self._waiters) >= self.max_queue:
+            self._stats["rejected_full"] += 1
+            raise Overloaded(
+                f"The {self.name} model is busy ({len(self._waiters)} requests queued). Try again shortly.",
+                429, self._retry_after(position),
+            )
+        wait = self.estimated_wait(position)
+        if wait > self.max_wait:
+            self._stats["rejected_deadline"] += 1
+            raise Overloaded(
+                f"The {self.name} model is overloaded (estimated wait {wait:.0f}s). Try again shortly.",
+                503, self._retry_after(position),
+            )
+
+    async def _acquire(self):
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return
+        self.check()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._stats["queued"] += 1
+        print(f"   Queued for the {self.name} model at position {len(self._waiters)}.")
+        try:
+            await asyncio.wait_for(future, timeout=self.max_wait)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                self._release()  # the slot was handed over just as we gave up
+            elif future in self._waiters:
+                self._waiters.remove(future)
+            if isinstance(e, asyncio.TimeoutError):
+                self._stats["timed_out"] += 1
+                raise Overloaded(
+                    f"Timed out after {self.max_wait:.0f}s waiting for the {self.name} model.",
+                    503, self._retry_after(len(self._waiters) + 1),
+                )
+            raise
+
+    def _release(self):
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)  # hand the slot straight to the next waiter
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one generation slot, waiting in line or raising :class:`Overloaded`."""
+        await self._acquire()
+        self._stats["admitted"] += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            # Exponential moving average keeps the wait estimate tracking the current model speed.
+            self._service_time = elapsed if self._service_time is None else 0.8 * self._service_time + 0.2 * elapsed
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "active": self._active,
+            "waiting": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "avg_generation_seconds": round(self._service_time or 0.0, 3),
+        }
+
+_controllers = {}
+
+def ensure_admission(engine: str) -> AdmissionController:
+    """Per-engine controller configured by ``<ENGINE>_LLM_CONCURRENCY``, ``_LLM_QUEUE`` and ``_LLM_MAX_WAIT``.
+
+    Without ``OLLAMA_LLM_CONCURRENCY``, Ollama gets ``OLLAMA_LLM_CONCURRENCY_PER_NODE`` slots for
+    each configured server, so adding servers adds throughput.
+    """
+    controller = _controllers.get(engine)
+    if controller is not None:
+        return controller
+    prefix = engine.upper()
+    defaults = _DEFAULTS[engine]
+    try:
+        concurrency = defaults["concurrency"]
+        if engine == "ollama":
+            concurrency = int(os.getenv("OLLAMA_LLM_CONCURRENCY_PER_NODE", str(concurrency))) * configured_node_count()
+        concurrency = max(1, int(os.getenv(f"{prefix}_LLM_CONCURRENCY", str(concurrency))))
+        queue = max(0, int(os.getenv(f"{prefix}_LLM_QUEUE", str(defaults["queue"]))))
+        max_wait = float(os.getenv(f"{prefix}_LLM_MAX_WAIT", str(defaults["max_wait"])))
+    except ValueError:
+        per_node = f"{prefix}_LLM_CONCURRENCY_PER_NODE, " if engine == "ollama" else ""
+        raise RuntimeError(
+            f"{per_node}{prefix}_LLM_CONCURRENCY, {prefix}_LLM_QUEUE and {prefix}_LLM_MAX_WAIT must be numbers if set."
+        )
+    controller = _controllers[engine] = AdmissionController(engine, concurrency, queue, max_wait)
+    return controller
+
+def admission_stats() -> dict:
+    return {engine: controller.stats() for engine, controller in _controllers.items()}
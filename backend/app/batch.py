@@ -0,0 +1,48 @@
+import asyncio
+import functools
+import os
+from typing import List
+from .cache import normalize_claim
+from .pipeline import check_claim, check_text
+
+def _limit(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        raise RuntimeError(f"{name} must be an integer if set.")
+
+def max_batch_size() -> int:
+    return _limit("BATCH_MAX_CLAIMS", 100)
+
+async def run_batch(engine: str, claims: List[str]) -> List[dict]:
+    """Fact-check ``claims`` concurrently, returning one ``{"claim", "result"|"error"}`` item per input.
+
+    Duplicate claims (after normalization) are checked once. Each item goes through the claim
+    pre-filter like a single request. Searches and LLM calls run under separate semaphores so a
+    slow model never holds up retrieval for the rest of the batch.
+    """
+    search_slots = asyncio.Semaphore(_limit("BATCH_SEARCH_CONCURRENCY", 8))
+    llm_slots = asyncio.Semaphore(_limit("BATCH_LLM_CONCURRENCY", 2))
+
+    unique = {}
+    for claim in claims:
+        unique.setdefault(normalize_claim(claim), claim)
+    check = functools.partial(check_claim, engine, search_slots=search_slots, llm_slots=llm_slots)
+    outcomes = await asyncio.gather(
+        *(check_text(engine, check, claim) for claim in unique.values()),
+        return_exceptions=True,
+    )
+    by_key = {}
+    for key, outcome in zip(unique, outcomes):
+        if isinstance(outcome, BaseException):
+            outcome = {"error": str(outcome) or type(outcome).__name__}
+        by_key[key] = outcome
+
+    items = []
+    for claim in claims:
+        outcome = by_key[normalize_claim(claim)]
+        if "error" in outcome:
+            items.append({"claim": claim, "error": outcome["error"]})
+        else:
+            items.append({"claim": claim, "result": outcome})
+    return items
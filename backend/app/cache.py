@@ -0,0 +1,201 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional
+from .concurrency import run_blocking
+
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_claim(claim: str) -> str:
+    """Fold case, punctuation and whitespace so trivially different claims share a key."""
+    text = unicodedata.normalize("NFKC", claim or "").casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+def cache_key(engine: str, model: str, claim: str) -> str:
+    return f"{engine}|{model}|{normalize_claim(claim)}"
+
+class ResultCache:
+    """In-process LRU with TTL, optionally backed by a SQLite file that survives restarts.
+
+    The SQLite file runs in WAL mode, so several server processes can share it: a verdict
+    stored by one worker is a disk hit for the others. Its ``fact_check_leases`` table lets
+    workers agree on which of them computes a claim (see :meth:`acquire_lease`). SQLite calls
+    can wait up to 10 s on another worker's write lock, so :meth:`get` and :meth:`set` run
+    them on the worker pool, and coroutines call the lease methods through ``run_blocking``.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 6 * 3600, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Separate from _lock, so memory hits never wait behind a SQLite call.
+        self._db_lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "leases": 0, "leases_denied": 0}
+        self._db: Optional[sqlite3.Connection] = None
+        self._owner = f"{os.getpid()}-{id(self)}"
+        self.db_path = db_path
+        if db_path:
+            # Another worker may hold the write lock for a moment; wait instead of failing.
+            self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=10.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS fact_check_cache ("
+                "key TEXT PRIMARY KEY, result TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS fact_check_leases ("
+                "key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @property
+    def shared(self) -> bool:
+        """Whether the cache has a SQLite file other processes can see."""
+        return self._db is not None
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return now - stored_at > self.ttl_seconds
+
+    def _remember(self, key: str, result: dict, stored_at: float):
+        self._entries[key] = (result, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _memory_get(self, key: str, now: float) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            result, stored_at = entry
+            if self._expired(stored_at, now):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            return dict(result)
+
+    def _disk_get(self, key: str, now: float, count_miss: bool) -> Optional[dict]:
+        """The SQLite tier of :meth:`get`; counts the miss when there is no fresh row (or no file)."""
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT result, stored_at FROM fact_check_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and self._expired(row[1], now):
+                    self._db.execute("DELETE FROM fact_check_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                    row = None
+            if row is not None:
+                result = json.loads(row[0])
+                with self._lock:
+                    self._remember(key, result, row[1])
+                    self._stats["disk_hits"] += 1
+                return dict(result)
+        if count_miss:
+            with self._lock:
+                self._stats["misses"] += 1
+        return None
+
+    async def get(self, engine: str, model: str, claim: str, count_miss: bool = True) -> Optional[dict]:
+        """Memory hits answer inline; the SQLite lookup runs on the worker pool."""
+        key = cache_key(engine, model, claim)
+        now = time.time()
+        cached = self._memory_get(key, now)
+        if cached is not None:
+            return cached
+        if self._db is None:
+            return self._disk_get(key, now, count_miss)  # only counts the miss
+        return await run_blocking(self._disk_get, key, now, count_miss)
+
+    def _disk_set(self, key: str, result: dict, stored_at: float):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO fact_check_cache (key, result, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(result), stored_at),
+            )
+            self._db.commit()
+
+    async def set(self, engine: str, model: str, claim: str, result: dict):
+        """Store in memory inline; the SQLite write runs on the worker pool."""
+        key = cache_key(engine, model, claim)
+        stored_at = time.time()
+        with self._lock:
+            self._remember(key, dict(result), stored_at)
+            self._stats["stores"] += 1
+        if self._db is not None:
+            await run_blocking(self._disk_set, key, result, stored_at)
+
+    def acquire_lease(self, engine: str, model: str, claim: str, ttl_seconds: float) -> bool:
+        """Claim the right to compute ``claim`` across processes; False while another worker holds it.
+
+        A lease left behind by a worker that died expires after ``ttl_seconds``.
+        Without a SQLite file there is nobody to share with and the lease is always granted.
+        Blocks on SQLite: call it through ``run_blocking`` from coroutines.
+        """
+        if self._db is None:
+            return True
+        key = cache_key(engine, model, claim)
+        now = time.time()
+        with self._db_lock:
+            self._db.execute("DELETE FROM fact_check_leases WHERE key = ? AND expires_at < ?", (key, now))
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO fact_check_leases (key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self._owner, now + ttl_seconds),
+            )
+            self._db.commit()
+            granted = cursor.rowcount == 1
+        with self._lock:
+            self._stats["leases" if granted else "leases_denied"] += 1
+        return granted
+
+    def release_lease(self, engine: str, model: str, claim: str):
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "DELETE FROM fact_check_leases WHERE key = ? AND owner = ?",
+                (cache_key(engine, model, claim), self._owner),
+            )
+            self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_path": self.db_path,
+                "shared": self._db is not None,
+            }
+
+_result_cache: Optional[ResultCache] = None
+
+def ensure_result_cache() -> ResultCache:
+    global _result_cache
+    if _result_cache is not None:
+        return _result_cache
+    try:
+        max_entries = int(os.getenv("RESULT_CACHE_SIZE", "1024"))
+        ttl_seconds = float(os.getenv("RESULT_CACHE_TTL", str(6 * 3600)))
+    except ValueError:
+        raise RuntimeError("RESULT_CACHE_SIZE and RESULT_CACHE_TTL must be numbers if set.")
+    _result_cache = ResultCache(
+        max_entries=max_entries,
+        ttl_seconds=ttl_seconds,
+        db_path=os.getenv("RESULT_CACHE_DB") or None,
+    )
+    return _result_cache
@@ -0,0 +1,97 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+def _ensure_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is not None:
+        return _executor
+    try:
+        workers = int(os.getenv("BLOCKING_POOL_SIZE", "8"))
+    except ValueError:
+        raise RuntimeError("BLOCKING_POOL_SIZE must be an integer if set.")
+    _executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="juansource-blocking")
+    return _executor
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call on the bounded worker pool so the event loop stays free."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_ensure_executor(), functools.partial(func, *args, **kwargs))
+
+_builds = {}
+
+async def build_once(factory):
+    """Run a blocking ``ensure_*`` factory on the worker pool; concurrent first callers share one build.
+
+    A build that failed is retried by the next caller.
+    """
+    task = _builds.get(factory)
+    if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+        task = _builds[factory] = asyncio.ensure_future(run_blocking(factory))
+    return await asyncio.shield(task)
+
+async def ainvoke_llm(llm, prompt):
+    """Prefer the client's native ``ainvoke``; fall back to ``invoke`` on the worker pool."""
+    if hasattr(llm, "ainvoke"):
+        return await llm.ainvoke(prompt)
+    return await run_blocking(llm.invoke, prompt)
+
+async def astream_llm(llm, prompt):
+    """Yield response text as it is generated; clients without ``astream`` yield it in one piece."""
+    if hasattr(llm, "astream"):
+        async for chunk in llm.astream(prompt):
+            text = getattr(chunk, "content", chunk)
+            if text:
+                yield text
+        return
+    response = await ainvoke_llm(llm, prompt)
+    yield getattr(response, "content", str(response))
+
+class SingleFlight:
+    """Run at most one computation per key; concurrent callers with the same key await its result.
+
+    The shared task is shielded, so a caller that disconnects does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._stats = {"leaders": 0, "coalesced": 0, "peak_waiters": 0}
+
+    def _finished(self, key, task):
+        if self._calls.get(key, {}).get("task") is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark as retrieved even if every caller went away
+
+    async def run(self, key, factory):
+        call = self._calls.get(key)
+        if call is None:
+            task = asyncio.ensure_future(factory())
+            call = self._calls[key] = {"task": task, "waiters": 0}
+            task.add_done_callback(functools.partial(self._finished, key))
+            self._stats["leaders"] += 1
+            return await asyncio.shield(task)
+        call["waiters"] += 1
+        self._stats["coalesced"] += 1
+        self._stats["peak_waiters"] = max(self._stats["peak_waiters"], call["waiters"])
+        try:
+            return await asyncio.shield(call["task"])
+        finally:
+            call["waiters"] -= 1
+
+    async def join(self, key):
+        """Await the running computation for ``key``; returns ``(False, None)`` when there is none."""
+        if key not in self._calls:
+            return False, None
+        return True, await self.run(key, None)
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "in_flight": len(self._calls),
+            "waiters": sum(call["waiters"] for call in self._calls.values()),
+        }
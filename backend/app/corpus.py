@@ -0,0 +1,337 @@
+"""Local evidence corpus: every fetched search result plus bulk-loaded archives, searchable with BM25.
+
+Layout under ``EVIDENCE_CORPUS_PATH``:
+
+- ``docs.jsonl``: one document per line, appended as results arrive (the source of truth).
+- ``seg-<n>.post``: postings as native uint32 ``(doc_id, term_frequency)`` pairs, memory-mapped.
+- ``seg-<n>.terms.json``: ``term -> [first_pair, pair_count]`` into the matching ``.post`` file.
+- ``seg-<n>.lens``: uint32 token count of each document in the segment.
+- ``manifest.json``: the live segments and the documents they cover.
+
+New documents are indexed in memory and written out as a segment every ``FLUSH_SIZE`` documents;
+segments are merged once there are more than ``MAX_SEGMENTS``. Anything not yet in a segment is
+re-indexed from ``docs.jsonl`` on startup, so a crash loses nothing.
+
+Bulk-load archives (JSONL or a JSON array of objects with ``title``, ``link``/``url`` and
+``snippet``/``text``) from the backend folder with::
+
+    python -m app.corpus archive.jsonl [more.jsonl ...]
+"""
+import argparse
+import heapq
+import json
+import math
+import mmap
+import os
+import sys
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Optional
+from .concurrency import build_once
+from .evidence import tokenize
+from .urls import url_key
+
+FLUSH_SIZE = 512
+MAX_SEGMENTS = 8
+K1 = 1.2
+B = 0.75
+
+def _document(item: dict, source: str) -> Optional[dict]:
+    link = (item.get("link") or item.get("url") or "").strip()
+    if not link:
+        return None
+    return {
+        "title": item.get("title") or "Untitled",
+        "link": link,
+        "snippet": item.get("snippet") or item.get("text") or item.get("description") or "",
+        "source": item.get("source") or source,
+        "added_at": time.time(),
+    }
+
+class _Segment:
+    def __init__(self, directory: Path, name: str, first_doc: int, doc_count: int):
+        self.name = name
+        self.first_doc = first_doc
+        self.doc_count = doc_count
+        self.terms = json.loads((directory / f"{name}.terms.json").read_text(encoding="utf-8"))
+        self._file = open(directory / f"{name}.post", "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._pairs = memoryview(self._mmap).cast("I") if self._mmap is not None else memoryview(array("I"))
+
+    def postings(self, term: str):
+        entry = self.terms.get(term)
+        if entry is None:
+            return ()
+        start, count = entry
+        pairs = self._pairs[2 * start: 2 * (start + count)]
+        return zip(pairs[0::2], pairs[1::2])
+
+    def close(self):
+        self._pairs.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+def _write_segment(directory: Path, name: str, postings: dict, lengths):
+    """Write ``{term: [(doc_id, tf), ...]}`` and per-document lengths as segment ``name``."""
+    pairs, terms = array("I"), {}
+    for term in sorted(postings):
+        entries = postings[term]
+        terms[term] = [len(pairs) // 2, len(entries)]
+        for doc_id, tf in entries:
+            pairs.append(doc_id)
+            pairs.append(tf)
+    (directory / f"{name}.post").write_bytes(pairs.tobytes())
+    (directory / f"{name}.lens").write_bytes(array("I", lengths).tobytes())
+    (directory / f"{name}.terms.json").write_text(json.dumps(terms), encoding="utf-8")
+
+class EvidenceCorpus:
+    """Append-only document store with a segmented, memory-mapped BM25 index."""
+
+    def __init__(self, path: str, min_score: float = 0.6, min_hits: int = 3, max_age: float = 7 * 86400):
+        self.path = Path(path)
+        self.min_score = min_score
+        self.min_hits = min_hits
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._offsets = array("Q")
+        self._lengths = array("I")
+        self._total_length = 0
+        self._links = set()
+        self._segments = []
+        self._next_segment = 1
+        self._pending = defaultdict(list)
+        self._pending_first = 0
+        self._stats = {"queries": 0, "local_answers": 0, "added": 0}
+        self._load()
+
+    def _docs_file(self) -> Path:
+        return self.path / "docs.jsonl"
+
+    def _load(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        manifest_file = self.path / "manifest.json"
+        manifest = json.loads(manifest_file.read_text(encoding="utf-8")) if manifest_file.exists() else {}
+        self._next_segment = manifest.get("next_segment", 1)
+        for entry in manifest.get("segments", []):
+            self._segments.append(_Segment(self.path, entry["name"], entry["first_doc"], entry["doc_count"]))
+            self._lengths.frombytes((self.path / f"{entry['name']}.lens").read_bytes())
+        self._pending_first = len(self._lengths)
+        self._total_length = sum(self._lengths)
+
+        docs_file = self._docs_file()
+        if not docs_file.exists():
+            return
+        with docs_file.open("rb") as handle:
+            offset = 0
+            for line in handle:
+                if line.endswith(b"\n") and line.strip():
+                    doc = json.loads(line)
+                    doc_id = len(self._offsets)
+                    self._offsets.append(offset)
+                    self._links.add(url_key(doc["link"]))
+                    if doc_id >= self._pending_first:
+                        self._index_pending(doc_id, doc)
+                offset += len(line)
+            if offset and not line.endswith(b"\n"):
+                # A crash mid-append left half a line; drop it so the next append starts clean.
+                handle.close()
+                with docs_file.open("r+b") as writer:
+                    writer.truncate(offset - len(line))
+
+    def _index_pending(self, doc_id: int, doc: dict):
+        tokens = tokenize(f"{doc['title']} {doc['snippet']}")
+        for term, tf in Counter(tokens).items():
+            self._pending[term].append((doc_id, tf))
+        self._lengths.append(len(tokens))
+        self._total_length += len(tokens)
+
+    def add(self, items, source: str = "google") -> int:
+        """Store search results not seen before; returns how many were new."""
+        added = 0
+        with self._lock:
+            docs_file = self._docs_file()
+            with docs_file.open("ab") as handle:
+                offset = handle.tell()
+                for item in items if isinstance(items, list) else []:
+                    doc = _document(item, source) if isinstance(item, dict) else None
+                    if doc is None or url_key(doc["link"]) in self._links:
+                        continue
+                    line = (json.dumps(doc, ensure_ascii=False) + "\n").encode("utf-8")
+                    handle.write(line)
+                    doc_id = len(self._offsets)
+                    self._offsets.append(offset)
+                    offset += len(line)
+                    self._links.add(url_key(doc["link"]))
+                    self._index_pending(doc_id, doc)
+                    added += 1
+                    if len(self._offsets) - self._pending_first >= FLUSH_SIZE:
+                        handle.flush()
+                        self._flush()
+            self._stats["added"] += added
+        return added
+
+    def _flush(self):
+        count = len(self._offsets) - self._pending_first
+        if count == 0:
+            return
+        name = f"seg-{self._next_segment:06d}"
+        _write_segment(self.path, name, self._pending, self._lengths[self._pending_first:])
+        self._segments.append(_Segment(self.path, name, self._pending_first, count))
+        self._next_segment += 1
+        self._pending = defaultdict(list)
+        self._pending_first = len(self._offsets)
+        if len(self._segments) > MAX_SEGMENTS:
+            self._merge_segments()
+        self._write_manifest()
+
+    def _merge_segments(self):
+        merged = defaultdict(list)
+        for segment in self._segments:
+            for term in segment.terms:
+                merged[term].extend(segment.postings(term))
+        name = f"seg-{self._next_segment:06d}"
+        _write_segment(self.path, name, merged, self._lengths[: self._pending_first])
+        old, self._segments = self._segments, [_Segment(self.path, name, 0, self._pending_first)]
+        self._next_segment += 1
+        self._write_manifest()
+        for segment in old:
+            segment.close()
+            for suffix in (".post", ".lens", ".terms.json"):
+                (self.path / f"{segment.name}{suffix}").unlink(missing_ok=True)
+
+    def _write_manifest(self):
+        manifest = {
+            "next_segment": self._next_segment,
+            "segments": [
+                {"name": s.name, "first_doc": s.first_doc, "doc_count": s.doc_count} for s in self._segments
+            ],
+        }
+        temp = self.path / "manifest.json.tmp"
+        temp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(temp, self.path / "manifest.json")
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _read_docs(self, doc_ids) -> dict:
+        docs = {}
+        with self._docs_file().open("rb") as handle:
+            for doc_id in doc_ids:
+                handle.seek(self._offsets[doc_id])
+                docs[doc_id] = json.loads(handle.readline())
+        return docs
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """Top ``limit`` documents by BM25, each with a ``score`` normalised so that a document of
+        average length containing every query term once scores 1.0."""
+        terms = set(tokenize(query))
+        with self._lock:
+            self._stats["queries"] += 1
+            total = len(self._offsets)
+            if not terms or not total:
+                return []
+            average = self._total_length / total or 1.0
+            scores, norm = defaultdict(float), 0.0
+            for term in terms:
+                postings = [p for segment in self._segments for p in segment.postings(term)]
+                postings += self._pending.get(term, [])
+                df = len(postings)
+                idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+                norm += idf
+                for doc_id, tf in postings:
+                    length = self._lengths[doc_id]
+                    scores[doc_id] += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / average))
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            docs = self._read_docs([doc_id for doc_id, _ in top])
+        return [
+            {"title": docs[doc_id]["title"], "link": docs[doc_id]["link"], "snippet": docs[doc_id]["snippet"],
+             "source": docs[doc_id]["source"], "added_at": docs[doc_id].get("added_at", 0.0),
+             "score": round(score / norm, 4) if norm else 0.0}
+            for doc_id, score in top
+        ]
+
+    def sufficient(self, hits: list) -> bool:
+        """Whether local hits are strong and recent enough to skip the Google search.
+
+        Documents stored more than ``max_age`` seconds ago (0 = no limit) never count as strong:
+        the answer may have changed since, so Google is asked again and the old hits are only merged.
+        """
+        oldest = time.time() - self.max_age if self.max_age > 0 else 0.0
+        strong = sum(1 for hit in hits if hit["score"] >= self.min_score and hit.get("added_at", 0.0) >= oldest)
+        answered = strong >= self.min_hits
+        if answered:
+            self._stats["local_answers"] += 1
+        return answered
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "enabled": True,
+                "documents": len(self._offsets),
+                "segments": len(self._segments),
+                "pending": len(self._offsets) - self._pending_first,
+                "min_score": self.min_score,
+                "min_hits": self.min_hits,
+                "max_age_seconds": self.max_age,
+                "path": str(self.path),
+            }
+
+_corpus: Optional[EvidenceCorpus] = None
+
+def ensure_corpus() -> Optional[EvidenceCorpus]:
+    """The process-wide corpus, or None when ``EVIDENCE_CORPUS_PATH`` is not set."""
+    global _corpus
+    if _corpus is not None:
+        return _corpus
+    path = os.getenv("EVIDENCE_CORPUS_PATH")
+    if not path:
+        return None
+    try:
+        min_score = float(os.getenv("EVIDENCE_CORPUS_MIN_SCORE", "0.6"))
+        min_hits = int(os.getenv("EVIDENCE_CORPUS_MIN_HITS", "3"))
+        max_age = float(os.getenv("EVIDENCE_CORPUS_MAX_AGE", str(7 * 86400)))
+    except ValueError:
+        raise RuntimeError(
+            "EVIDENCE_CORPUS_MIN_SCORE, EVIDENCE_CORPUS_MIN_HITS and EVIDENCE_CORPUS_MAX_AGE must be numbers if set."
+        )
+    _corpus = EvidenceCorpus(path, min_score=min_score, min_hits=min_hits, max_age=max_age)
+    return _corpus
+
+async def aensure_corpus() -> Optional[EvidenceCorpus]:
+    """:func:`ensure_corpus` for coroutines: the first build, which replays and indexes
+    ``docs.jsonl``, runs on the worker pool."""
+    if _corpus is not None or not os.getenv("EVIDENCE_CORPUS_PATH"):
+        return _corpus
+    return await build_once(ensure_corpus)
+
+def _read_archive(path: Path) -> list:
+    text = path.read_text(encoding="utf-8").strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-load fact-check archives into the local evidence corpus.")
+    parser.add_argument("files", nargs="+", help="JSONL files or JSON arrays of {title, link|url, snippet|text}")
+    parser.add_argument("--source", default="archive", help="source label stored with each document")
+    args = parser.parse_args(argv)
+    corpus = ensure_corpus()
+    if corpus is None:
+        print("Set EVIDENCE_CORPUS_PATH to the corpus folder first.")
+        return 1
+    for name in args.files:
+        added = corpus.add(_read_archive(Path(name)), source=args.source)
+        print(f"{name}: {added} new documents.")
+    corpus.flush()
+    print(f"Corpus now holds {corpus.stats()['documents']} documents.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import asyncio
+import importlib
+import os
+import time
+from .concurrency import run_blocking
+
+# Engine name -> module, imported only when the engine is first needed.
+_MODULES = {
+    "gemini": ".fact_checker",
+    "ollama": ".fact_checkerOLLAMA",
+}
+
+_loaded = {}
+_imports = {}
+_status = {}
+_background = []
+
+class EngineUnavailable(RuntimeError):
+    """The engine is disabled on this deployment or failed to load."""
+
+def enabled_engines() -> list:
+    """Engines listed in ``ENABLED_ENGINES`` (comma-separated; default: all)."""
+    value = os.getenv("ENABLED_ENGINES")
+    if not value:
+        return list(_MODULES)
+    engines = [name.strip().lower() for name in value.split(",") if name.strip()]
+    unknown = [name for name in engines if name not in _MODULES]
+    if unknown:
+        raise RuntimeError(f"ENABLED_ENGINES has unknown engines: {', '.join(unknown)} (choose from {', '.join(_MODULES)}).")
+    return engines
+
+def _set_status(engine: str, **fields):
+    _status.setdefault(engine, {"state": "cold", "error": None})
+    _status[engine].update(fields)
+
+def _import(engine: str):
+    start = time.perf_counter()
+    module = importlib.import_module(_MODULES[engine], __package__)
+    _set_status(engine, import_seconds=round(time.perf_counter() - start, 3))
+    return module
+
+async def load_engine(engine: str):
+    """The engine's module, imported on first use (off the event loop); raises :class:`EngineUnavailable`."""
+    module = _loaded.get(engine)
+    if module is not None:
+        return module
+    if engine not in enabled_engines():
+        raise EngineUnavailable(f"The {engine} engine is not enabled on this server (ENABLED_ENGINES).")
+    task = _imports.get(engine)
+    if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+        # Concurrent first requests share one import; a failed import is retried next time.
+        task = _imports[engine] = asyncio.ensure_future(run_blocking(_import, engine))
+    try:
+        module = await asyncio.shield(task)
+    except Exception as e:
+        _set_status(engine, state="failed", error=f"import failed: {e}")
+        raise EngineUnavailable(f"The {engine} engine could not be loaded: {e}") from e
+    _loaded[engine] = module
+    return module
+
+def loaded_engine(engine: str):
+    """The engine's module if it has already been imported, else None (never triggers an import)."""
+    return _loaded.get(engine)
+
+async def _prepare(engine: str):
+    _set_status(engine, state="loading", error=None)
+    start = time.perf_counter()
+    try:
+        module = await load_engine(engine)
+        await module.aprepare()
+    except Exception as e:
+        _set_status(engine, state="failed", error=str(e) or type(e).__name__)
+        print(f"⚠️  {engine} engine is not ready: {e}")
+        return
+    _set_status(engine, state="warm", ready_seconds=round(time.perf_counter() - start, 3))
+    print(f"{engine} engine ready in {time.perf_counter() - start:.1f}s")
+    background = getattr(module, "abackground", None)
+    if background is not None:
+        _background.append(asyncio.create_task(background()))
+
+def start_background_init() -> list:
+    """Import every enabled engine, build its clients and run health checks without blocking startup."""
+    tasks = [asyncio.create_task(_prepare(engine)) for engine in enabled_engines()]
+    _background.extend(tasks)
+    return tasks
+
+async def stop_background():
+    for task in _background:
+        if not task.done():
+            task.cancel()
+    _background.clear()
+
+def readiness() -> dict:
+    """Per-engine state (``cold``, ``loading``, ``warm``, ``failed``) and whether all enabled engines can serve."""
+    enabled = enabled_engines()
+    engines = {}
+    for engine in _MODULES:
+        if engine not in enabled:
+            engines[engine] = {"enabled": False, "ready": False, "state": "disabled"}
+            continue
+        status = dict(_status.get(engine, {"state": "cold", "error": None}))
+        health = getattr(_loaded.get(engine), "health", None)
+        if health is not None:
+            status.update(health())
+        ready = status["state"] == "warm" and status.get("healthy", True)
+        engines[engine] = {"enabled": True, "ready": ready, **status}
+    return {"ready": all(engines[engine]["ready"] for engine in enabled), "engines": engines}
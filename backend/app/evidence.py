@@ -0,0 +1,154 @@
+import os
+import re
+from typing import Optional
+from . import urls
+from .concurrency import run_blocking
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with "
+    "ang ay mga na ng sa si".split()
+)
+
+_encoding = None
+_encoding_failed = False
+
+def _ensure_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is not None or _encoding_failed or tiktoken is None:
+        return _encoding
+    try:
+        _encoding = tiktoken.get_encoding(os.getenv("EVIDENCE_TOKENIZER", "cl100k_base"))
+    except Exception as e:
+        print(f"⚠️  Tokenizer unavailable ({e}); estimating evidence tokens from length instead.")
+        _encoding_failed = True
+    return _encoding
+
+async def aload_tokenizer():
+    """Load the tokenizer on the worker pool; the first load may download its BPE file."""
+    if _encoding is None and not _encoding_failed and tiktoken is not None:
+        await run_blocking(_ensure_encoding)
+
+def tokenizer_name() -> str:
+    encoding = _ensure_encoding()
+    return encoding.name if encoding is not None else "chars/4"
+
+def count_tokens(text: str) -> int:
+    """Token count with a BPE tokenizer when tiktoken is installed, else a ~4 chars/token estimate."""
+    encoding = _ensure_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+def _int_env(name: str, default: int, minimum: int = 0) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, str(default))))
+    except ValueError:
+        raise RuntimeError(f"{name} must be an integer if set.")
+
+def token_budget(env_var: str, default: int) -> int:
+    return _int_env(env_var, default)
+
+def describe(stats: dict) -> str:
+    return (
+        f"Packed {stats['used']}/{stats['candidates']} results into {stats['tokens']} tokens "
+        f"(budget {stats['budget']}, tokenizer {stats['tokenizer']})"
+    )
+
+def tokenize(text: str) -> list:
+    """Lowercased content words of ``text``, in order; shared by evidence ranking and the local corpus."""
+    return [word for word in _WORD.findall(text.lower()) if len(word) > 1 and word not in _STOPWORDS]
+
+def _terms(text: str) -> set:
+    return set(tokenize(text))
+
+def _jaccard(left: set, right: set) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+def _format_item(idx: int, title: str, url: str, snippet: str) -> str:
+    return f"{idx}. {title}\nURL: {url}\nSummary: {snippet}"
+
+def pack_evidence(claim: str, results, budget: int, max_per_domain: Optional[int] = None):
+    """Format search results for the prompt within ``budget`` tokens.
+
+    Results are ranked by term overlap with the claim (search rank breaks ties), near-duplicate
+    snippets and over-represented domains are dropped, and items are added until the budget is
+    spent; the last item that does not fit is truncated rather than skipped when worthwhile.
+    Returns ``(text, stats)`` where ``stats`` reports how many results and tokens were used.
+    """
+    if max_per_domain is None:
+        max_per_domain = _int_env("EVIDENCE_MAX_PER_DOMAIN", 2, minimum=1)
+    stats = {"candidates": 0, "used": 0, "tokens": 0, "budget": budget, "tokenizer": tokenizer_name()}
+    if isinstance(results, str):
+        text = results
+        while text and count_tokens(text) > budget:
+            text = text[: int(len(text) * 0.9)]
+        stats.update(tokens=count_tokens(text), used=1 if text else 0)
+        return text, stats
+    if not isinstance(results, list):
+        return str(results), stats
+
+    candidates = []
+    for rank, item in enumerate(results):
+        if not isinstance(item, dict):
+            continue
+        url = item.get("link") or item.get("url") or ""
+        snippet = item.get("snippet") or item.get("description") or ""
+        if not url and not snippet:
+            continue
+        title = item.get("title") or "Untitled"
+        candidates.append((rank, title, url, snippet, _terms(f"{title} {snippet}")))
+    stats["candidates"] = len(candidates)
+    if not candidates:
+        # Keeps the "no good result" placeholder visible to the model, as before.
+        return "\n".join(str(item) for item in results), stats
+
+    claim_terms = _terms(claim)
+    def relevance(candidate):
+        rank, _, _, _, terms = candidate
+        overlap = len(claim_terms & terms) / len(claim_terms) if claim_terms else 0.0
+        return (-overlap, rank)
+    candidates.sort(key=relevance)
+
+    chunks, kept_terms, per_domain = [], [], {}
+    used_tokens = 0
+    for _, title, url, snippet, terms in candidates:
+        domain = urls.domain(url)
+        if domain and per_domain.get(domain, 0) >= max_per_domain:
+            continue
+        if any(_jaccard(terms, seen) >= 0.8 for seen in kept_terms):
+            continue
+        separator = 1 if chunks else 0  # the blank line between items is roughly one token
+        remaining = budget - used_tokens - separator
+        chunk = _format_item(len(chunks) + 1, title, url, snippet)
+        tokens = count_tokens(chunk)
+        if tokens > remaining:
+            header_tokens = count_tokens(_format_item(len(chunks) + 1, title, url, ""))
+            if remaining - header_tokens < 24:
+                continue
+            # Trim the snippet proportionally, then tighten until it fits.
+            keep = int(len(snippet) * (remaining - header_tokens) / max(tokens - header_tokens, 1))
+            while keep > 0:
+                chunk = _format_item(len(chunks) + 1, title, url, snippet[:keep].rstrip() + "…")
+                tokens = count_tokens(chunk)
+                if tokens <= remaining:
+                    break
+                keep = int(keep * 0.85)
+            if keep <= 0:
+                continue
+        chunks.append(chunk)
+        kept_terms.append(terms)
+        per_domain[domain] = per_domain.get(domain, 0) + 1
+        used_tokens += tokens + separator
+        if budget - used_tokens < 24:
+            break
+
+    stats.update(used=len(chunks), tokens=used_tokens)
+    return "\n\n".join(chunks), stats
@@ -1,16 +1,24 @@
+import asyncio
 import os
-import re
 from pathlib import Path
 from types import SimpleNamespace
 from typing import Optional
 from dotenv import load_dotenv, find_dotenv
-from langchain_community.utilities import GoogleSearchAPIWrapper
-from langchain_core.prompts import PromptTemplate
+from . import pipeline
+from . import search as search_client
+from .concurrency import astream_llm, run_blocking
+from .evidence import aload_tokenizer, count_tokens, describe, pack_evidence, token_budget
+from .metrics import GenerationTimer, observe, timed
+from .parsing import (
+    FACT_CHECK_JSON_SCHEMA,
+    parse_fact_check_output,
+    parse_structured_output,
+    structured_output_enabled,
+)
+from .prompts import PromptSet, prompt_text
 
 load_dotenv(find_dotenv(usecwd=True) or Path(__file__).resolve().parents[2] / ".env")
 
-_llm: Optional[ChatGoogleGenerativeAI] = None
-_search: Optional[GoogleSearchAPIWrapper] = None
 genai = None
 _genai_exc = None
 try:
@@ -24,21 +32,10 @@ except Exception as exc:
     except Exception as genai_exc:
         _genai_exc = genai_exc
 
-def _ensure_google_search() -> GoogleSearchAPIWrapper:
-    global _search
-    if _search is not None:
-        return _search
-    api_missing = [key for key in ('GOOGLE_API_KEY', 'GOOGLE_CSE_ID') if not os.getenv(key)]
-    if api_missing:
-        raise RuntimeError(
-            f"Missing Google Custom Search credentials: {', '.join(api_missing)}. "
-            "Set them in your environment or .env file."
-        )
-    _search = GoogleSearchAPIWrapper()
-    return _search
+_llm: Optional[ChatGoogleGenerativeAI] = None
 
 class _NativeGeminiClient:
-    def __init__(self, api_key: str, model_name: str, temperature: float):
+    def __init__(self, api_key: str, model_name: str, temperature: float, structured: bool = False):
         if genai is None:
             raise RuntimeError(
                 "LangChain Gemini adapter failed to load "
@@ -46,13 +43,34 @@ class _NativeGeminiClient:
                 "Run: pip install -U langchain-core langchain-google-genai google-generativeai"
             ) from (_genai_exc or _langchain_google_exc)
         genai.configure(api_key=api_key)
+        generation_config = {"temperature": temperature}
+        if structured:
+            generation_config["response_mime_type"] = "application/json"
+            generation_config["response_schema"] = FACT_CHECK_JSON_SCHEMA
         self._model = genai.GenerativeModel(
             model_name=model_name,
-            generation_config={"temperature": temperature},
+            generation_config=generation_config,
         )
 
-    def invoke(self, prompt: str):
-        result = self._model.generate_content(prompt)
+    # Messages are sent as one text with the system message first, which keeps the shared prefix.
+    def invoke(self, prompt):
+        return self._to_message(self._model.generate_content(prompt_text(prompt)))
+
+    async def ainvoke(self, prompt):
+        return self._to_message(await self._model.generate_content_async(prompt_text(prompt)))
+
+    async def astream(self, prompt):
+        response = await self._model.generate_content_async(prompt_text(prompt), stream=True)
+        async for chunk in response:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. safety metadata) raise instead of returning "".
+                text = ""
+            yield SimpleNamespace(content=text)
+
+    @staticmethod
+    def _to_message(result):
         text = getattr(result, "text", None)
         if not text and hasattr(result, "candidates"):
             parts = []
@@ -65,6 +83,9 @@ class _NativeGeminiClient:
             text = "\n".join(parts)
         return SimpleNamespace(content=(text or str(result)))
 
+def model_name() -> str:
+    return os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')
+
 def _ensure_llm() -> object:
     global _llm
     if _llm is not None:
@@ -76,22 +97,33 @@ def _ensure_llm() -> object:
             "No Gemini credentials found. Provide GOOGLE_API_KEY or GOOGLE_APPLICATION_CREDENTIALS "
             "before starting the backend."
         )
-    model_name = os.getenv('GEMINI_MODEL', 'gemini-2.5-flash')
     temperature = float(os.getenv('LLM_TEMPERATURE', '0.1'))
+    structured = structured_output_enabled()
     if ChatGoogleGenerativeAI is not None:
+        structured_kwargs = (
+            {"response_mime_type": "application/json", "response_schema": FACT_CHECK_JSON_SCHEMA}
+            if structured else {}
+        )
         _llm = ChatGoogleGenerativeAI(
-            model=model_name,
+            model=model_name(),
             temperature=temperature,
             google_api_key=api_key or None,
+            **structured_kwargs,
         )
     else:
         _llm = _NativeGeminiClient(
             api_key=api_key or "",
-            model_name=model_name,
+            model_name=model_name(),
             temperature=temperature,
+            structured=structured,
         )
     return _llm
 
+async def aprepare():
+    """Startup hook: build the Gemini client and load the tokenizer before the first request."""
+    await run_blocking(_ensure_llm)
+    await aload_tokenizer()
+
 # III. The Reasoning Prompt Template
 RAG_PROMPT_TEMPLATE = """
 **FACT-CHECKER ASSIGNMENT: RAG Fake News Detector**
@@ -120,54 +152,93 @@ Evidence: [
   "https://www.source-link-2.com/news"
 ]
 """
-RAG_PROMPT = PromptTemplate.from_template(RAG_PROMPT_TEMPLATE)
-
-def _extract_section(text: str, label: str) -> str:
-    pattern = re.compile(rf"{label}\s*(.*?)(?=\n[A-Z][a-zA-Z]+:|$)", re.IGNORECASE | re.DOTALL)
-    match = pattern.search(text)
-    return match.group(1).strip() if match else ""
-
-def _normalise_classification(value: str) -> str:
-    lowered = (value or "").lower()
-    if any(token in lowered for token in ["real", "true", "verified"]):
-        return "real"
-    if any(token in lowered for token in ["fake", "false", "hoax"]):
-        return "fake"
-    return "unknown"
+PROMPTS = PromptSet(RAG_PROMPT_TEMPLATE)
 
 def _parse_fact_check_output(raw: str):
-    classification = _extract_section(raw, "Classification:")
-    reasoning = _extract_section(raw, "Reasoning:")
-    evidence_block = _extract_section(raw, "Evidence:")
-    evidence = re.findall(r"https?://[^\s\"')]+", evidence_block or "")
-    return _normalise_classification(classification), reasoning or raw.strip(), evidence
+    # Gemini sticks to the requested format, so its reasoning is returned as written.
+    return parse_structured_output(raw) or parse_fact_check_output(raw, clean=False)
+
+def _pack_evidence(claim: str, search_results) -> str:
+    evidence, stats = pack_evidence(claim, search_results, token_budget("GEMINI_EVIDENCE_TOKENS", 2000))
+    print(f"   {describe(stats)}.")
+    return evidence
+
+def _prepare_prompt(claim: str, search_results):
+    with timed("prompt_build", "gemini", model_name()):
+        evidence = _pack_evidence(claim, search_results)
+        final_prompt = PROMPTS.build(claim, evidence, structured_output_enabled())
+    text = prompt_text(final_prompt)
+    observe("prompt_chars", len(text), "gemini", model_name())
+    observe("prompt_tokens", count_tokens(text), "gemini", model_name())
+    return final_prompt
+
+def _build_result(response):
+    raw_text = getattr(response, "content", str(response)).strip()
+    with timed("parse", "gemini", model_name()):
+        classification, reasoning, evidence = _parse_fact_check_output(raw_text)
+    return {
+        "classification": classification,
+        "reasoning": reasoning,
+        "evidence": evidence,
+        "raw": raw_text,
+    }
 
 def run_fact_check(claim: str):
-    if not claim.strip():
-        return {"error": "Claim must not be empty."}
-    print(f"1. Verifying Claim: '{claim}'")
+    """Blocking entry point for scripts; must not be called from a running event loop."""
+    return asyncio.run(arun_fact_check(claim))
+
+async def asearch_evidence(claim: str):
+    """Search stage of the fact-check (the flow lives in ``pipeline``); raises on failure."""
+    print("2. Performing Google Search...")
+    with timed("search", "gemini", model_name()):
+        search_results = await search_client.aresults(claim, num_results=10)
+    print("3. Evidence retrieved.")
+    return search_results
+
+async def areason(claim: str, search_results):
+    """Generation stage of the fact-check; returns the result or error dict."""
     try:
-        search = _ensure_google_search()
-        print("2. Performing Google Search...")
-        search_results = search.results(claim, num_results=10)
-        print("3. Evidence retrieved.")
+        llm = await run_blocking(_ensure_llm)
+        await aload_tokenizer()
+        final_prompt = _prepare_prompt(claim, search_results)
+        print("4. Sending evidence to Gemini for Reasoning...")
+        # Streamed internally so time-to-first-token is measured on non-streaming requests too.
+        timer = GenerationTimer("gemini", model_name())
+        parts = []
+        async for token in astream_llm(llm, final_prompt):
+            timer.token()
+            parts.append(token)
+        timer.done()
+        return _build_result(SimpleNamespace(content="".join(parts)))
     except Exception as e:
-        print(f"Error during Google Search: {e}")
+        print(f"Error during Gemini Reasoning: {e}")
         return {"error": str(e)}
 
+async def arun_fact_check(claim: str):
+    """Check ``claim`` with this engine through :func:`pipeline.check_claim` (caches, coalescing, admission)."""
+    return await pipeline.check_claim("gemini", claim)
+
+async def astream_reason(claim: str, search_results):
+    """Streamed generation stage: token events, then the result or an error."""
     try:
-        llm = _ensure_llm()
-        final_prompt = RAG_PROMPT.format(query=claim, search_results=search_results)
-        print("4. Sending evidence to Gemini for Reasoning...")
-        response = llm.invoke(final_prompt)
-        raw_text = getattr(response, "content", str(response)).strip()
-        classification, reasoning, evidence = _parse_fact_check_output(raw_text)
-        return {
-            "classification": classification,
-            "reasoning": reasoning,
-            "evidence": evidence,
-            "raw": raw_text,
-        }
+        llm = await run_blocking(_ensure_llm)
+        await aload_tokenizer()
+        final_prompt = _prepare_prompt(claim, search_results)
+        yield "stage", {"stage": "generation_started", "model": model_name()}
+        timer = GenerationTimer("gemini", model_name())
+        parts = []
+        async for token in astream_llm(llm, final_prompt):
+            timer.token()
+            parts.append(token)
+            yield "token", {"text": token}
+        timer.done()
     except Exception as e:
         print(f"Error during Gemini Reasoning: {e}")
-        return {"error": str(e)}
\ No newline at end of file
+        yield "error", {"error": str(e)}
+        return
+    yield "result", _build_result(SimpleNamespace(content="".join(parts)))
+
+async def astream_fact_check(claim: str):
+    """Yield ``(event, data)`` pairs for a streamed check; see :func:`pipeline.stream_claim`."""
+    async for event, data in pipeline.stream_claim("gemini", claim):
+        yield event, data
@@ -1,6 +1,7 @@
+import asyncio
 import os
-import re
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Optional
 from dotenv import load_dotenv, find_dotenv
 try:
@@ -8,73 +9,142 @@ try:
 except ImportError:
     # Fallback to deprecated import if new package not installed
     from langchain_community.chat_models import ChatOllama
-try:
-    from langchain_google_community import GoogleSearchAPIWrapper
-except ImportError:
-    # Fallback to deprecated import if new package not installed
-    from langchain_community.utilities import GoogleSearchAPIWrapper
-from langchain_core.prompts import PromptTemplate
-import httpx
+from . import pipeline
+from . import search as search_client
+from .concurrency import astream_llm, run_blocking
+from .evidence import aload_tokenizer, count_tokens, describe, pack_evidence, token_budget
+from .http_clients import ensure_async_client, pool_limits
+from .metrics import GenerationTimer, observe, timed
+from .ollama_pool import OllamaNode, OllamaPool, configured_base_urls, health_check_interval
+from .parsing import (
+    FACT_CHECK_JSON_SCHEMA,
+    parse_fact_check_output,
+    parse_structured_output,
+    structured_output_enabled,
+)
+from .prompts import PromptSet, prompt_layout, prompt_text
 
 load_dotenv(find_dotenv(usecwd=True) or Path(__file__).resolve().parents[2] / ".env")
 
-_llm: Optional[ChatOllama] = None
-_search: Optional[GoogleSearchAPIWrapper] = None
-
-def _ensure_google_search() -> GoogleSearchAPIWrapper:
-    global _search
-    if _search is not None:
-        return _search
-    api_missing = [key for key in ('GOOGLE_API_KEY', 'GOOGLE_CSE_ID') if not os.getenv(key)]
-    if api_missing:
-        raise RuntimeError(
-            f"Missing Google Custom Search credentials: {', '.join(api_missing)}. "
-            "Set them in your environment or .env file."
-        )
-    _search = GoogleSearchAPIWrapper()
-    return _search
-
-def _check_ollama_connection(base_url: str) -> bool:
-    """Check if Ollama is running and accessible."""
-    try:
-        response = httpx.get(f"{base_url}/api/tags", timeout=5.0)
-        return response.status_code == 200
-    except Exception:
-        return False
-
-def _ensure_llm() -> ChatOllama:
-    global _llm
-    if _llm is not None:
-        return _llm
-    model = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+_pool: Optional[OllamaPool] = None
+
+def model_name() -> str:
+    return os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+
+def _base_url() -> str:
     configured_host = os.getenv("OLLAMA_BASE_URL") or os.getenv("OLLAMA_HOST")
     if configured_host:
-        base_url = configured_host if configured_host.startswith("http") else f"http://{configured_host}"
-    else:
-        base_url = "http://localhost:11434"
-    
-    # Check if Ollama is running
-    if not _check_ollama_connection(base_url):
-        raise RuntimeError(
-            f"Ollama is not running or not accessible at {base_url}. "
-            "Please make sure Ollama is installed and running. "
-            "You can start it by running 'ollama serve' or ensure it's running in the background."
-        )
-    
+        return configured_host if configured_host.startswith("http") else f"http://{configured_host}"
+    return "http://localhost:11434"
+
+def _keep_alive():
+    """``OLLAMA_KEEP_ALIVE`` as Ollama expects it: a duration string ("5m") or seconds (-1 = forever)."""
+    value = os.getenv("OLLAMA_KEEP_ALIVE", "5m").strip()
+    return int(value) if value.lstrip("-").isdigit() else value
+
+def _num_ctx() -> Optional[int]:
+    """``OLLAMA_NUM_CTX``: the context window to request, or None for the server's default.
+
+    Ollama drops the start of a prompt that overflows the window, which also throws away the
+    cached instruction prefix, so set it above the largest prompt plus the answer.
+    """
+    value = os.getenv("OLLAMA_NUM_CTX")
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise RuntimeError("OLLAMA_NUM_CTX must be an integer if set.")
+
+def _options() -> dict:
+    num_ctx = _num_ctx()
+    return {"num_ctx": num_ctx} if num_ctx else {}
+
+def _format_kwargs() -> dict:
+    if not structured_output_enabled():
+        return {}
+    # langchain_ollama passes a JSON schema through to Ollama; the legacy wrapper only knows "json".
+    if ChatOllama.__module__.startswith("langchain_ollama"):
+        return {"format": FACT_CHECK_JSON_SCHEMA}
+    return {"format": "json"}
+
+def _client_kwargs() -> dict:
+    # Only langchain_ollama's ChatOllama forwards client_kwargs to its httpx clients.
+    fields = getattr(ChatOllama, "model_fields", None) or getattr(ChatOllama, "__fields__", {})
+    if "client_kwargs" in fields:
+        return {"client_kwargs": {"limits": pool_limits()}}
+    return {}
+
+def _build_llm(base_url: str, model: str) -> ChatOllama:
     try:
         temperature = float(os.getenv("LLM_TEMPERATURE", "0.1"))
     except ValueError:
         raise RuntimeError("LLM_TEMPERATURE must be a number if set.")
-    
+
     print(f"Connecting to Ollama at {base_url} with model: {model}")
-    _llm = ChatOllama(
+    return ChatOllama(
         model=model,
         base_url=base_url,
         temperature=temperature,
-        keep_alive="5m",
+        keep_alive=_keep_alive(),
         timeout=120.0,  # 2 minute timeout for model responses
+        **_options(),
+        **_format_kwargs(),
+        **_client_kwargs(),
     )
-    return _llm
+
+def ensure_pool() -> OllamaPool:
+    """All configured Ollama servers (``OLLAMA_BASE_URLS``, else ``OLLAMA_BASE_URL``)."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    _pool = OllamaPool(configured_base_urls(_base_url()), _build_llm)
+    return _pool
+
+async def _warm_up_node(node: OllamaNode):
+    try:
+        # Load with the same num_ctx as real requests; a different context size reloads the model.
+        payload = {"model": model_name(), "keep_alive": _keep_alive(), "options": _options()}
+        if prompt_layout() == "system":
+            # One token from the system message alone leaves the shared prefix in the KV cache.
+            payload["messages"] = [{"role": "system", "content": PROMPTS.system_message(structured_output_enabled())}]
+            payload["options"] = {**payload["options"], "num_predict": 1}
+            payload["stream"] = False
+            url = f"{node.base_url}/api/chat"
+        else:
+            # A generate call without a prompt only loads the model and applies keep_alive.
+            url = f"{node.base_url}/api/generate"
+        response = await ensure_async_client().post(url, json=payload, timeout=120.0)
+        response.raise_for_status()
+        await run_blocking(node.client, model_name())
+        print(f"Ollama model '{model_name()}' warmed up at {node.base_url} (keep_alive={_keep_alive()})")
+    except Exception as e:
+        print(f"⚠️  Ollama warm-up skipped for {node.base_url}: {e}")
+
+async def awarm_up():
+    """Load the model into every node's memory and build the clients before the first request."""
+    await asyncio.gather(*(_warm_up_node(node) for node in ensure_pool().nodes))
+
+async def aprepare():
+    """Startup hook: load the tokenizer, health-check every node, then build clients (and load the model unless OLLAMA_WARMUP=0)."""
+    await aload_tokenizer()
+    pool = ensure_pool()
+    await pool.check_all()
+    if os.getenv("OLLAMA_WARMUP", "1").lower() not in ("0", "false", "no"):
+        await awarm_up()
+    else:
+        await asyncio.gather(*(run_blocking(node.client, model_name()) for node in pool.nodes))
+
+async def abackground():
+    """Periodic node health checks for the lifetime of the app."""
+    interval = health_check_interval()
+    if interval > 0:
+        await ensure_pool().run_health_checks(interval)
+
+def health() -> dict:
+    nodes = ensure_pool().stats()
+    healthy = sum(1 for node in nodes if node["healthy"])
+    return {"healthy": healthy > 0, "healthy_nodes": healthy, "nodes": len(nodes)}
 
 # III. The Reasoning Prompt Template
 RAG_PROMPT_TEMPLATE = """
@@ -103,244 +173,175 @@ Evidence: [
   "https://www.source-link-2.com/news"
 ]
 """
-RAG_PROMPT = PromptTemplate.from_template(RAG_PROMPT_TEMPLATE)
+PROMPTS = PromptSet(RAG_PROMPT_TEMPLATE)
 
-def _extract_section(text: str, label: str) -> str:
-    pattern = re.compile(rf"{label}\s*(.*?)(?=\n[A-Z][a-zA-Z]+:|$)", re.IGNORECASE | re.DOTALL)
-    match = pattern.search(text)
-    return match.group(1).strip() if match else ""
+def _parse_fact_check_output(raw: str):
+    return parse_structured_output(raw) or parse_fact_check_output(raw)
 
-def _normalise_classification(value: str) -> str:
-    lowered = (value or "").lower()
-    if any(token in lowered for token in ["real", "true", "verified"]):
-        return "real"
-    if any(token in lowered for token in ["fake", "false", "hoax"]):
-        return "fake"
-    return "unknown"
+def _prepare_prompt(claim: str, search_results, model: str, evidence_tokens: Optional[int] = None):
+    if evidence_tokens is None:
+        evidence_tokens = token_budget("OLLAMA_EVIDENCE_TOKENS", 600)
+    with timed("prompt_build", "ollama", model):
+        # Prompt length drives local inference time, so evidence is packed into a fixed token budget.
+        evidence, stats = pack_evidence(claim, search_results, evidence_tokens)
+        print(f"   {describe(stats)}.")
 
-def _parse_fact_check_output(raw: str):
-    classification = _extract_section(raw, "Classification:")
-    reasoning = _extract_section(raw, "Reasoning:")
-    evidence_block = _extract_section(raw, "Evidence:")
-    evidence = re.findall(r"https?://[^\s\"')]+", evidence_block or "")
-    
-    # Validate and fix citation numbers in reasoning if they exceed available sources
-    if reasoning and evidence:
-        max_citation = len(evidence)
-        # Find all citation references like [1], [2], [5], etc.
-        citation_pattern = re.compile(r'\[(\d+)\]')
-        citations_found = citation_pattern.findall(reasoning)
-        
-        if citations_found:
-            max_citation_in_text = max(int(c) for c in citations_found)
-            if max_citation_in_text > max_citation:
-                print(f"   ⚠️  Warning: Reasoning references citation [{max_citation_in_text}] but only {max_citation} sources available. Citations may be incorrect.")
-    
-    # Clean up reasoning: remove any evidence/URL sections that might be embedded
-    # The LLM sometimes includes the Evidence section in the Reasoning output
-    if reasoning:
-        # Remove everything from "**Evidence:**" onwards, including the entire array block
-        # This pattern matches: **Evidence:** followed by optional whitespace, then [ and everything until the end
-        evidence_pattern = re.compile(
-            r'\*\*?EVIDENCE\*\*?:?\s*\[.*?\]\s*$',
-            re.IGNORECASE | re.DOTALL
-        )
-        reasoning = evidence_pattern.sub('', reasoning)
-        
-        # Also handle plain "Evidence:" format
-        evidence_pattern2 = re.compile(
-            r'EVIDENCE:?\s*\[.*?\]\s*$',
-            re.IGNORECASE | re.DOTALL
-        )
-        reasoning = evidence_pattern2.sub('', reasoning)
-        
-        # Remove "**Evidence:**" or "Evidence:" markers even without arrays (fallback)
-        evidence_pattern3 = re.compile(
-            r'\*\*?EVIDENCE\*\*?:?\s*.*$',
-            re.IGNORECASE | re.DOTALL
-        )
-        reasoning = evidence_pattern3.sub('', reasoning)
-        
-        # Now clean line by line to remove any remaining evidence artifacts
-        lines = reasoning.split('\n')
-        cleaned_lines = []
-        in_evidence_section = False
-        bracket_count = 0
-        consecutive_stars = 0
-        
-        for i, line in enumerate(lines):
-            # Detect start of evidence section - various formats
-            if re.search(r'\*\*?EVIDENCE\*\*?:?', line, re.IGNORECASE):
-                in_evidence_section = True
-                bracket_count = 0
-                continue
-            
-            if re.search(r'^\s*EVIDENCE:?\s*$', line, re.IGNORECASE):
-                in_evidence_section = True
-                bracket_count = 0
-                continue
-            
-            # Detect lines with multiple asterisks (like ****) that might indicate evidence section
-            star_count = line.count('*')
-            if star_count >= 3 and not in_evidence_section:
-                # Check if next lines contain URLs - if so, this is likely an evidence marker
-                lookahead = '\n'.join(lines[i+1:min(i+5, len(lines))])
-                if re.search(r'https?://', lookahead):
-                    in_evidence_section = True
-                    bracket_count = 0
-                    continue
-            
-            # If we're in an evidence section, track brackets and URLs
-            if in_evidence_section:
-                # Count brackets to know when array ends
-                bracket_count += line.count('[')
-                bracket_count -= line.count(']')
-                
-                # Check if this line contains a URL (quoted or not)
-                has_url = bool(re.search(r'https?://', line))
-                # Check if this line is just asterisks or whitespace
-                is_asterisk_line = re.match(r'^\s*\*+\s*$', line)
-                
-                # Skip this line if it's part of the evidence array/URLs
-                if bracket_count > 0:
-                    continue
-                elif has_url or is_asterisk_line:
-                    # Still in evidence section, skip this line
-                    continue
-                elif bracket_count == 0 and ']' in line:
-                    # Array closed, we're done with evidence section
-                    in_evidence_section = False
-                    bracket_count = 0
-                    continue
-                elif not has_url and not is_asterisk_line and bracket_count == 0:
-                    # No more URLs or brackets, might be done with evidence section
-                    # But check if next line has URL
-                    if i + 1 < len(lines):
-                        next_line = lines[i + 1]
-                        if not re.search(r'https?://', next_line):
-                            in_evidence_section = False
-                            bracket_count = 0
-                    else:
-                        in_evidence_section = False
-                        bracket_count = 0
-                    continue
-            
-            # Skip standalone URLs (not in evidence section but shouldn't be in reasoning)
-            if re.match(r'^\s*https?://', line):
-                continue
-            if re.match(r'^\s*\d+\.\s*["\']?https?://', line):
-                continue
-            # Skip array brackets that might be standalone
-            if re.match(r'^\s*[\[\]]\s*$', line):
-                continue
-            # Skip lines with only asterisks
-            if re.match(r'^\s*\*+\s*$', line):
-                continue
-            # Skip quoted URLs that might be standalone
-            if re.match(r'^\s*["\']https?://', line):
-                continue
-            
-            cleaned_lines.append(line)
-        
-        reasoning = '\n'.join(cleaned_lines).strip()
-        
-        # Final cleanup: remove any remaining evidence markers or trailing brackets
-        reasoning = re.sub(r'\*\*?EVIDENCE\*\*?:?\s*', '', reasoning, flags=re.IGNORECASE)
-        reasoning = re.sub(r'EVIDENCE:?\s*', '', reasoning, flags=re.IGNORECASE)
-        reasoning = re.sub(r'\s*\[\s*\]\s*$', '', reasoning)  # Remove trailing empty arrays
-        reasoning = re.sub(r'\s*\[\s*$', '', reasoning)  # Remove trailing opening bracket
-        # Remove trailing asterisks
-        reasoning = re.sub(r'\s*\*+\s*$', '', reasoning)
-        # Remove any trailing quoted URLs
-        reasoning = re.sub(r'\s*["\']https?://[^\s"\']+["\']\s*,?\s*$', '', reasoning, flags=re.MULTILINE)
-        
-        # Remove leading markdown bold markers (**) from the start of the text
-        reasoning = re.sub(r'^\s*\*\*\s*', '', reasoning)  # Remove ** at the start
-        reasoning = re.sub(r'^\s*\*\s*', '', reasoning)  # Remove single * at the start (fallback)
-    
-    return _normalise_classification(classification), reasoning or raw.strip(), evidence
-
-def _format_search_results(results) -> str:
-    if isinstance(results, str):
-        return results[:3000]
-    if isinstance(results, list):
-        chunks = []
-        for idx, item in enumerate(results[:5], start=1):
-            title = item.get("title") or "Untitled"
-            url = item.get("link") or item.get("url") or ""
-            snippet = (item.get("snippet") or item.get("description") or "")[:300]
-            chunks.append(f"{idx}. {title}\nURL: {url}\nSummary: {snippet}")
-        return "\n\n".join(chunks)
-    return str(results)
+        final_prompt = PROMPTS.build(claim, evidence, structured_output_enabled())
+    text = prompt_text(final_prompt)
+    prompt_length = len(text)
+    prompt_tokens = count_tokens(text)
+    observe("prompt_chars", prompt_length, "ollama", model)
+    observe("prompt_tokens", prompt_tokens, "ollama", model)
+    print("4. Sending evidence to local LLM for Reasoning...")
+    print(f"   Model: {model}, Prompt length: {prompt_length} chars")
+    num_ctx = _num_ctx()
+    if num_ctx and prompt_tokens > num_ctx * 0.75:
+        print(f"   ⚠️  Prompt (~{prompt_tokens} tokens) leaves little room in OLLAMA_NUM_CTX={num_ctx}; raise it to keep the cached prefix.")
+
+    if prompt_length > 10000:
+        print(f"   ⚠️  Warning: Large prompt ({prompt_length} chars). This may take 30-60 seconds...")
+    elif prompt_length > 5000:
+        print(f"   ⚠️  Warning: Medium prompt ({prompt_length} chars). This may take 15-30 seconds...")
+    else:
+        print(f"   ✓ Prompt size is reasonable. Processing...")
+    return final_prompt
+
+def _build_result(response, elapsed: float, model: str):
+    print(f"5. Received response from LLM in {elapsed:.1f} seconds, parsing...")
+
+    raw_text = getattr(response, "content", str(response)).strip()
+    if not raw_text:
+        print("   ⚠️  Warning: Empty response from LLM")
+        return {"error": "Received empty response from the AI model. Please try again."}
+
+    print(f"   Response length: {len(raw_text)} chars")
+    with timed("parse", "ollama", model):
+        classification, reasoning, evidence = _parse_fact_check_output(raw_text)
+    print(f"6. Classification: {classification}, Evidence URLs: {len(evidence)}")
+    return {
+        "classification": classification,
+        "reasoning": reasoning,
+        "evidence": evidence,
+        "raw": raw_text,
+    }
+
+def _is_connection_error(e: Exception) -> bool:
+    error_msg = str(e)
+    return isinstance(e, (ConnectionError, TimeoutError)) or "Connection" in error_msg \
+        or "timeout" in error_msg.lower() or "refused" in error_msg.lower()
+
+def _node_failed(pool: OllamaPool, node: OllamaNode, e: Exception):
+    pool.mark_failed(node, e)
+    print(f"   ⚠️  Ollama node {node.base_url} failed ({e}); taking it out of rotation.")
+
+def _llm_error(e: Exception, model: Optional[str] = None):
+    error_msg = str(e)
+    print(f"❌ Error during LLM Reasoning: {error_msg}")
+    print(f"   Error type: {type(e).__name__}")
+
+    if _is_connection_error(e):
+        return {
+            "error": f"Failed to connect to Ollama. Make sure Ollama is running and the model '{model or model_name()}' is pulled. Error: {error_msg}"
+        }
+    if "404" in error_msg or "not found" in error_msg.lower():
+        model = model or model_name()
+        return {
+            "error": f"Model '{model}' not found. Please pull it first: 'ollama pull {model}'"
+        }
+    return {"error": f"LLM processing error: {error_msg}"}
 
 def run_fact_check(claim: str):
-    if not claim.strip():
-        return {"error": "Claim must not be empty."}
-    print(f"1. Verifying Claim: '{claim}'")
+    """Blocking entry point for scripts; must not be called from a running event loop."""
+    return asyncio.run(arun_fact_check(claim))
+
+async def asearch_evidence(claim: str):
+    """Search stage of the fact-check (the flow lives in ``pipeline``); raises on failure."""
+    print("2. Performing Google Search...")
+    with timed("search", "ollama", model_name()):
+        search_results = await search_client.aresults(claim, num_results=10)
+    print(f"3. Evidence retrieved. Found {len(search_results) if isinstance(search_results, list) else 'N/A'} results.")
+    return search_results
+
+async def areason(claim: str, search_results, model: Optional[str] = None, evidence_tokens: Optional[int] = None):
+    """Generation stage of the fact-check; returns the result or error dict.
+
+    Runs on the least-loaded Ollama node and retries on another one if the node cannot be reached.
+    ``model`` and ``evidence_tokens`` override ``OLLAMA_MODEL`` and ``OLLAMA_EVIDENCE_TOKENS``.
+    """
+    model = model or model_name()
     try:
-        search = _ensure_google_search()
-        print("2. Performing Google Search...")
-        search_results = search.results(claim, num_results=5)  # Reduced to 5 for faster processing
-        print(f"3. Evidence retrieved. Found {len(search_results) if isinstance(search_results, list) else 'N/A'} results.")
+        await aload_tokenizer()
+        final_prompt = _prepare_prompt(claim, search_results, model, evidence_tokens)
     except Exception as e:
-        print(f"Error during Google Search: {e}")
-        return {"error": str(e)}
+        return _llm_error(e, model)
+    pool, tried, error = ensure_pool(), [], None
+    while (node := pool.acquire(exclude=tried)) is not None:
+        tried.append(node)
+        try:
+            llm = await run_blocking(node.client, model)
+            # Streamed internally so time-to-first-token is measured on non-streaming requests too.
+            timer = GenerationTimer("ollama", model)
+            parts = []
+            async for token in astream_llm(llm, final_prompt):
+                timer.token()
+                parts.append(token)
+            return _build_result(SimpleNamespace(content="".join(parts)), timer.done(), model)
+        except Exception as e:
+            if not _is_connection_error(e):
+                return _llm_error(e, model)
+            _node_failed(pool, node, e)
+            error = e
+        finally:
+            pool.release(node)
+    return _llm_error(error, model)
+
+async def arun_fact_check(claim: str):
+    """Check ``claim`` with this engine through :func:`pipeline.check_claim` (caches, coalescing, admission)."""
+    return await pipeline.check_claim("ollama", claim)
 
+async def astream_reason(claim: str, search_results):
+    """Streamed generation stage: token events, then the result or an error.
+
+    A node that cannot be reached before the first token is retried on another node.
+    """
+    model = model_name()
     try:
-        llm = _ensure_llm()
-        # Limit search results to prevent extremely long prompts
-        max_results = 5  # Reduced from 10 to speed up processing
-        if isinstance(search_results, list) and len(search_results) > max_results:
-            search_results = search_results[:max_results]
-            print(f"   Limited search results to {max_results} items for faster processing")
-        
-        final_prompt = RAG_PROMPT.format(
-            query=claim,
-            search_results=_format_search_results(search_results),
-        )
-        prompt_length = len(final_prompt)
-        print("4. Sending evidence to local LLM for Reasoning...")
-        print(f"   Model: {os.getenv('OLLAMA_MODEL', 'llama3.1:8b')}, Prompt length: {prompt_length} chars")
-        
-        if prompt_length > 10000:
-            print(f"   ⚠️  Warning: Large prompt ({prompt_length} chars). This may take 30-60 seconds...")
-        elif prompt_length > 5000:
-            print(f"   ⚠️  Warning: Medium prompt ({prompt_length} chars). This may take 15-30 seconds...")
-        else:
-            print(f"   ✓ Prompt size is reasonable. Processing...")
-        
-        import time
-        start_time = time.time()
-        response = llm.invoke(final_prompt)
-        elapsed = time.time() - start_time
-        print(f"5. Received response from LLM in {elapsed:.1f} seconds, parsing...")
-        
-        raw_text = getattr(response, "content", str(response)).strip()
-        if not raw_text:
-            print("   ⚠️  Warning: Empty response from LLM")
-            return {"error": "Received empty response from the AI model. Please try again."}
-        
-        print(f"   Response length: {len(raw_text)} chars")
-        classification, reasoning, evidence = _parse_fact_check_output(raw_text)
-        print(f"6. Classification: {classification}, Evidence URLs: {len(evidence)}")
-        return {
-            "classification": classification,
-            "reasoning": reasoning,
-            "evidence": evidence,
-            "raw": raw_text,
-        }
+        await aload_tokenizer()
+        final_prompt = _prepare_prompt(claim, search_results, model)
     except Exception as e:
-        error_msg = str(e)
-        print(f"❌ Error during LLM Reasoning: {error_msg}")
-        print(f"   Error type: {type(e).__name__}")
-        
-        if "Connection" in error_msg or "timeout" in error_msg.lower() or "refused" in error_msg.lower():
-            return {
-                "error": f"Failed to connect to Ollama. Make sure Ollama is running and the model '{os.getenv('OLLAMA_MODEL', 'llama3.1:8b')}' is pulled. Error: {error_msg}"
-            }
-        if "404" in error_msg or "not found" in error_msg.lower():
-            model_name = os.getenv('OLLAMA_MODEL', 'llama3.1:8b')
-            return {
-                "error": f"Model '{model_name}' not found. Please pull it first: 'ollama pull {model_name}'"
-            }
-        return {"error": f"LLM processing error: {error_msg}"}
\ No newline at end of file
+        yield "error", _llm_error(e)
+        return
+    pool, tried, parts, error = ensure_pool(), [], [], None
+    while True:
+        node = pool.acquire(exclude=tried)
+        if node is None:
+            yield "error", _llm_error(error)
+            return
+        tried.append(node)
+        try:
+            llm = await run_blocking(node.client, model)
+            yield "stage", {"stage": "generation_started", "model": model, "node": node.base_url}
+            timer = GenerationTimer("ollama", model)
+            async for token in astream_llm(llm, final_prompt):
+                timer.token()
+                parts.append(token)
+                yield "token", {"text": token}
+            break
+        except Exception as e:
+            if parts or not _is_connection_error(e):
+                yield "error", _llm_error(e)
+                return
+            _node_failed(pool, node, e)
+            error = e
+        finally:
+            pool.release(node)
+    result = _build_result(SimpleNamespace(content="".join(parts)), timer.done(), model)
+    if "error" in result:
+        yield "error", result
+        return
+    yield "result", result
+
+async def astream_fact_check(claim: str):
+    """Yield ``(event, data)`` pairs for a streamed check; see :func:`pipeline.stream_claim`."""
+    async for event, data in pipeline.stream_claim("ollama", claim):
+        yield event, data
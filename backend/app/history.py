@@ -0,0 +1,213 @@
+"""Write-behind history of every answered fact-check, with indexed queries for analytics.
+
+Requests only append to an in-memory queue; a background task writes the queue to SQLite in
+batches through the blocking pool, so the database never sits on the request path. Each row
+keeps the claim and its normalized key, the verdict, reasoning, raw model output, timings and
+evidence URLs (with their domain), indexed for the ``/history`` endpoints.
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Optional
+from . import urls
+from .cache import normalize_claim
+from .concurrency import run_blocking
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS checks ("
+    "id INTEGER PRIMARY KEY, checked_at REAL NOT NULL, engine TEXT NOT NULL, model TEXT, "
+    "claim TEXT NOT NULL, claim_key TEXT NOT NULL, classification TEXT, reasoning TEXT, raw TEXT, "
+    "cached INTEGER NOT NULL DEFAULT 0, tier TEXT, elapsed_ms REAL, stages TEXT, trace_id TEXT)",
+    "CREATE TABLE IF NOT EXISTS check_evidence ("
+    "check_id INTEGER NOT NULL REFERENCES checks(id), url TEXT NOT NULL, domain TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS checks_checked_at ON checks (checked_at)",
+    "CREATE INDEX IF NOT EXISTS checks_claim_key ON checks (claim_key, checked_at)",
+    "CREATE INDEX IF NOT EXISTS checks_classification ON checks (classification, checked_at)",
+    "CREATE INDEX IF NOT EXISTS check_evidence_domain ON check_evidence (domain, check_id)",
+    "CREATE INDEX IF NOT EXISTS check_evidence_check ON check_evidence (check_id)",
+)
+
+_SUMMARY_COLUMNS = "id, checked_at, engine, model, claim, classification, cached, tier, elapsed_ms, trace_id"
+
+def _connect(path: str) -> sqlite3.Connection:
+    db = sqlite3.connect(path, check_same_thread=False, timeout=10.0)
+    db.row_factory = sqlite3.Row
+    return db
+
+class HistoryStore:
+    """SQLite history fed by a bounded in-memory queue; see the module docstring."""
+
+    def __init__(self, path: str, batch_size: int = 200, flush_interval: float = 1.0, max_queue: int = 10000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._stats = {"recorded": 0, "written": 0, "dropped": 0, "batches": 0, "write_errors": 0, "last_batch_ms": 0.0}
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._db = _connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._db.execute(statement)
+        self._db.commit()
+        # WAL lets analytics queries read on their own connection while a batch is being written.
+        self._reader = _connect(path)
+
+    def record(self, engine: str, model: Optional[str], claim: str, result: dict,
+               elapsed: Optional[float] = None, trace_id: Optional[str] = None, stages: Optional[dict] = None):
+        """Queue one answer for writing. Never blocks: when the queue is full the answer is dropped."""
+        if len(self._queue) >= self.max_queue:
+            self._stats["dropped"] += 1
+            return
+        self._queue.append((time.time(), engine, model, claim, result, elapsed, trace_id, stages))
+        self._stats["recorded"] += 1
+        self._ensure_writer()
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_writer(self):
+        if self._writer is not None and not self._writer.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._writer = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write everything queued so far."""
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            try:
+                await run_blocking(self._write, batch)
+            except Exception as e:
+                self._stats["write_errors"] += 1
+                print(f"⚠️  Could not write {len(batch)} fact-checks to the history ({e}).")
+
+    def _write(self, batch: list):
+        start = time.perf_counter()
+        with self._write_lock:
+            cursor = self._db.cursor()
+            for checked_at, engine, model, claim, result, elapsed, trace_id, stages in batch:
+                cursor.execute(
+                    "INSERT INTO checks (checked_at, engine, model, claim, claim_key, classification, reasoning, raw, "
+                    "cached, tier, elapsed_ms, stages, trace_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        checked_at, engine, model, claim, normalize_claim(claim), result.get("classification"),
+                        result.get("reasoning"), result.get("raw"), int(bool(result.get("cached"))), result.get("tier"),
+                        round(elapsed * 1000, 1) if elapsed is not None else None,
+                        json.dumps(stages) if stages else None, trace_id,
+                    ),
+                )
+                check_id = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT INTO check_evidence (check_id, url, domain) VALUES (?, ?, ?)",
+                    [(check_id, url, urls.domain(url)) for url in result.get("evidence") or []],
+                )
+            self._db.commit()
+        self._stats["written"] += len(batch)
+        self._stats["batches"] += 1
+        self._stats["last_batch_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    async def aclose(self):
+        if self._writer is not None:
+            self._writer.cancel()
+        await self.flush()
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._read_lock:
+            return [dict(row) for row in self._reader.execute(sql, params).fetchall()]
+
+    def recent(self, limit: int = 20, classification: Optional[str] = None,
+               domain: Optional[str] = None, claim: Optional[str] = None) -> list:
+        """Latest answers, newest first, optionally only one verdict, evidence domain or claim."""
+        where, params = [], []
+        if classification:
+            where.append("classification = ?")
+            params.append(classification.lower())
+        if domain:
+            where.append("id IN (SELECT check_id FROM check_evidence WHERE domain = ?)")
+            domain = domain.strip().lower()
+            params.append(urls.domain(domain if "//" in domain else f"//{domain}"))
+        if claim:
+            where.append("claim_key = ?")
+            params.append(normalize_claim(claim))
+        clause = f"WHERE {' AND '.join(where)} " if where else ""
+        rows = self._query(
+            f"SELECT {_SUMMARY_COLUMNS} FROM checks {clause}ORDER BY checked_at DESC LIMIT ?", (*params, limit)
+        )
+        for row in rows:
+            row["cached"] = bool(row["cached"])
+        return self._with_evidence(rows)
+
+    def _with_evidence(self, rows: list) -> list:
+        if not rows:
+            return rows
+        ids = [row["id"] for row in rows]
+        evidence = {}
+        for item in self._query(
+            f"SELECT check_id, url FROM check_evidence WHERE check_id IN ({', '.join('?' * len(ids))})", ids
+        ):
+            evidence.setdefault(item["check_id"], []).append(item["url"])
+        for row in rows:
+            row["evidence"] = evidence.get(row["id"], [])
+        return rows
+
+    def top_claims(self, limit: int = 20, since_seconds: Optional[float] = None) -> list:
+        """Most-checked claims (by normalized text) with their latest wording and verdict."""
+        since = time.time() - since_seconds if since_seconds else 0.0
+        # SQLite fills the bare columns from the row that supplied MAX(checked_at).
+        return self._query(
+            "SELECT claim, classification AS latest_classification, COUNT(*) AS checks, "
+            "MAX(checked_at) AS last_checked FROM checks WHERE checked_at >= ? "
+            "GROUP BY claim_key ORDER BY checks DESC, last_checked DESC LIMIT ?",
+            (since, limit),
+        )
+
+    def top_domains(self, limit: int = 20, classification: Optional[str] = None) -> list:
+        """Evidence domains cited most often, optionally only for one verdict."""
+        clause, params = "", []
+        if classification:
+            clause, params = "WHERE c.classification = ? ", [classification.lower()]
+        return self._query(
+            "SELECT e.domain, COUNT(*) AS citations, COUNT(DISTINCT c.claim_key) AS claims "
+            f"FROM check_evidence e JOIN checks c ON c.id = e.check_id {clause}"
+            "GROUP BY e.domain ORDER BY citations DESC LIMIT ?",
+            (*params, limit),
+        )
+
+    def stats(self) -> dict:
+        return {**self._stats, "enabled": True, "queued": len(self._queue), "max_queue": self.max_queue, "path": self.path}
+
+_history: Optional[HistoryStore] = None
+
+def ensure_history() -> Optional[HistoryStore]:
+    """The process-wide history store, or None when ``HISTORY_DB`` is not set."""
+    global _history
+    if _history is not None:
+        return _history
+    path = os.getenv("HISTORY_DB")
+    if not path:
+        return None
+    try:
+        batch_size = max(1, int(os.getenv("HISTORY_BATCH_SIZE", "200")))
+        flush_interval = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))
+        max_queue = max(1, int(os.getenv("HISTORY_MAX_QUEUE", "10000")))
+    except ValueError:
+        raise RuntimeError("HISTORY_BATCH_SIZE, HISTORY_FLUSH_INTERVAL and HISTORY_MAX_QUEUE must be numbers if set.")
+    _history = HistoryStore(path, batch_size=batch_size, flush_interval=flush_interval, max_queue=max_queue)
+    return _history
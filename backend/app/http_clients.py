@@ -0,0 +1,37 @@
+import os
+from typing import Optional
+import httpx
+
+_async_client: Optional[httpx.AsyncClient] = None
+
+def _http2_enabled() -> bool:
+    if os.getenv("HTTP2_ENABLED", "1").lower() in ("0", "false", "no"):
+        return False
+    try:
+        import h2  # noqa: F401  (httpx only negotiates HTTP/2 when the h2 package is present)
+    except ImportError:
+        return False
+    return True
+
+def pool_limits() -> httpx.Limits:
+    try:
+        return httpx.Limits(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+        )
+    except ValueError:
+        raise RuntimeError("HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE and HTTP_KEEPALIVE_EXPIRY must be numbers if set.")
+
+def ensure_async_client() -> httpx.AsyncClient:
+    """Process-wide keep-alive client for coroutines; closed by the app lifespan."""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(limits=pool_limits(), http2=_http2_enabled(), timeout=10.0)
+    return _async_client
+
+async def aclose_clients():
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
@@ -1,11 +1,58 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import functools
+import json
+from contextlib import asynccontextmanager
+from pathlib import Path
+from dotenv import load_dotenv, find_dotenv
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List
-from .fact_checker import run_fact_check
-from .fact_checkerOLLAMA import run_fact_check as run_fact_check_ollama
+from typing import List, Optional
+from . import engines, metrics
+from .admission import Overloaded, admission_stats
+from .batch import max_batch_size, run_batch
+from .cache import ensure_result_cache
+from .concurrency import run_blocking
+from .corpus import aensure_corpus
+from .engines import EngineUnavailable, load_engine, loaded_engine
+from .history import ensure_history
+from .http_clients import aclose_clients
+from .pipeline import cascade_stats, check_claim, check_claim_auto, check_text, in_flight_stats, stream_claim
+from .prefilter import NotAClaim, prefilter_stats, prepare_claims
+from .search import ensure_evidence_cache
+from .semantic import aensure_semantic_index
 
-app = FastAPI(title="JuanSource API")
+# The engine modules load .env too, but only when first used; settings read at startup need it now.
+load_dotenv(find_dotenv(usecwd=True) or Path(__file__).resolve().parents[2] / ".env")
+
+async def _build_stores():
+    """Build the optional on-disk stores in the background, before the first request needs them."""
+    for build in (aensure_semantic_index, aensure_corpus):
+        try:
+            await build()
+        except Exception as e:
+            print(f"⚠️  {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Engines import and warm up in the background so the server accepts connections at once;
+    # /ready reports when they can serve.
+    engines.start_background_init()
+    stores = asyncio.create_task(_build_stores())
+    yield
+    stores.cancel()
+    await engines.stop_background()
+    corpus = await aensure_corpus()
+    if corpus is not None:
+        corpus.flush()
+    history = ensure_history()
+    if history is not None:
+        await history.aclose()
+    await aclose_clients()
+
+app = FastAPI(title="JuanSource API", lifespan=lifespan)
 
 # Enable CORS so React (running on a different port) can talk to this API
 app.add_middleware(
@@ -19,6 +66,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    # Every stage log line for this request carries the same trace ID, echoed back to the caller.
+    trace_id = metrics.new_trace_id(request.headers.get("X-Trace-Id"))
+    response = await call_next(request)
+    response.headers["X-Trace-Id"] = trace_id
+    return response
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.exception_handler(NotAClaim)
+async def not_a_claim_handler(request: Request, exc: NotAClaim):
+    return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+@app.exception_handler(EngineUnavailable)
+async def engine_unavailable_handler(request: Request, exc: EngineUnavailable):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
 # Pydantic model to define the structure of the request body
 class ClaimRequest(BaseModel):
     claim: str
@@ -28,17 +99,193 @@ class FactCheckResponse(BaseModel):
     reasoning: str
     evidence: List[str]
     raw: str
+    cached: bool = False
+    matched_claim: Optional[str] = None
+    tier: Optional[str] = None
+    answered_by: Optional[str] = None
+    escalation_reason: Optional[str] = None
+    # Set when the input was split into several claims: each one's own result or error.
+    claims: Optional[List["BatchItem"]] = None
+
+class BatchClaimRequest(BaseModel):
+    claims: List[str]
+
+class BatchItem(BaseModel):
+    claim: str
+    result: Optional[FactCheckResponse] = None
+    error: Optional[str] = None
+
+class BatchResponse(BaseModel):
+    results: List[BatchItem]
+
+FactCheckResponse.model_rebuild()
 
 @app.post("/fact-check", response_model=FactCheckResponse)
 async def fact_check_endpoint(request: ClaimRequest):
-    result = run_fact_check(request.claim)
+    result = await check_text("gemini", functools.partial(check_claim, "gemini"), request.claim)
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
     return result
 
 @app.post("/fact-check-ollama", response_model=FactCheckResponse)
 async def fact_check_ollama_endpoint(request: ClaimRequest):
-    result = run_fact_check_ollama(request.claim)
+    result = await check_text("ollama", functools.partial(check_claim, "ollama"), request.claim)
+    if "error" in result:
+        raise HTTPException(status_code=500, detail=result["error"])
+    return result
+
+@app.post("/fact-check-auto", response_model=FactCheckResponse)
+async def fact_check_auto_endpoint(request: ClaimRequest):
+    result = await check_text("auto", check_claim_auto, request.claim)
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
     return result
+
+async def _batch_fact_check(engine: str, claims: List[str]):
+    if len(claims) > max_batch_size():
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(claims)} claims (limit {max_batch_size()}).",
+        )
+    await load_engine(engine)
+    return {"results": await run_batch(engine, claims)}
+
+@app.post("/fact-check/batch", response_model=BatchResponse)
+async def fact_check_batch_endpoint(request: BatchClaimRequest):
+    return await _batch_fact_check("gemini", request.claims)
+
+@app.post("/fact-check-ollama/batch", response_model=BatchResponse)
+async def fact_check_ollama_batch_endpoint(request: BatchClaimRequest):
+    return await _batch_fact_check("ollama", request.claims)
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _sse_event(event: str, data) -> str:
+    if event == "result":
+        data = jsonable_encoder(FactCheckResponse(**data))
+    return _sse(event, data)
+
+async def _stream_fact_check(first, events):
+    yield _sse_event(*first)
+    async for event, data in events:
+        yield _sse_event(event, data)
+
+async def _event_stream(engine: str, text: str) -> StreamingResponse:
+    prepared = prepare_claims(text)
+    if prepared["rejected"]:
+        raise NotAClaim(prepared["rejected"])
+    if len(prepared["claims"]) > 1:
+        raise NotAClaim(
+            f"The text contains {len(prepared['claims'])} separate claims; stream them one at a time "
+            "or send them to the non-streaming endpoint, which checks them together."
+        )
+    events = stream_claim(engine, prepared["claims"][0])
+    # Pull the first event before responding so an overloaded model still gets a 429/503.
+    first = await events.__anext__()
+    return StreamingResponse(
+        _stream_fact_check(first, events),
+        media_type="text/event-stream",
+        # Stop reverse proxies from buffering the stream into a single late response.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/fact-check/stream")
+async def fact_check_stream_endpoint(request: ClaimRequest):
+    return await _event_stream("gemini", request.claim)
+
+@app.post("/fact-check-ollama/stream")
+async def fact_check_ollama_stream_endpoint(request: ClaimRequest):
+    return await _event_stream("ollama", request.claim)
+
+@app.get("/cache/stats")
+async def cache_stats_endpoint():
+    index = await aensure_semantic_index()
+    corpus = await aensure_corpus()
+    history = ensure_history()
+    return {
+        "results": ensure_result_cache().stats(),
+        "search": ensure_evidence_cache().stats(),
+        "semantic": index.stats() if index is not None else {"enabled": False},
+        "in_flight": in_flight_stats(),
+        "admission": admission_stats(),
+        "cascade": cascade_stats(),
+        "corpus": corpus.stats() if corpus is not None else {"enabled": False},
+        "prefilter": prefilter_stats(),
+        "history": history.stats() if history is not None else {"enabled": False},
+    }
+
+def _history():
+    history = ensure_history()
+    if history is None:
+        raise HTTPException(status_code=503, detail="Fact-check history is off on this server (set HISTORY_DB).")
+    return history
+
+@app.get("/history/recent")
+async def history_recent_endpoint(
+    limit: int = Query(20, ge=1, le=200),
+    classification: Optional[str] = None,
+    domain: Optional[str] = None,
+    claim: Optional[str] = None,
+):
+    """Latest answered checks, optionally filtered by verdict, evidence domain or (normalized) claim."""
+    history = _history()
+    return {"results": await run_blocking(history.recent, limit, classification, domain, claim)}
+
+@app.get("/history/top")
+async def history_top_endpoint(limit: int = Query(20, ge=1, le=200), days: Optional[float] = Query(None, gt=0)):
+    """Most-checked claims, over all time or the last ``days``."""
+    history = _history()
+    return {"results": await run_blocking(history.top_claims, limit, days * 86400 if days else None)}
+
+@app.get("/history/domains")
+async def history_domains_endpoint(limit: int = Query(20, ge=1, le=200), classification: Optional[str] = None):
+    """Evidence domains cited most often, optionally only for one verdict."""
+    history = _history()
+    return {"results": await run_blocking(history.top_domains, limit, classification)}
+
+@app.get("/ready")
+async def ready_endpoint():
+    """200 once every enabled engine is imported, warmed up and healthy; 503 with per-engine state until then."""
+    status = engines.readiness()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@app.get("/ollama/nodes")
+async def ollama_nodes_endpoint():
+    """Health and load of every configured Ollama server."""
+    module = await load_engine("ollama")
+    return {"model": module.model_name(), "nodes": module.ensure_pool().stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Per-stage latency and prompt-size histograms plus cache counters, in Prometheus text format."""
+    index = await aensure_semantic_index()
+    lines = [metrics.render().rstrip("\n")]
+    lines += metrics.render_gauges("juansource_result_cache", ensure_result_cache().stats(), "Verdict cache")
+    lines += metrics.render_gauges("juansource_search_cache", ensure_evidence_cache().stats(), "Search cache")
+    if index is not None:
+        lines += metrics.render_gauges("juansource_semantic_index", index.stats(), "Semantic claim index")
+    corpus = await aensure_corpus()
+    if corpus is not None:
+        lines += metrics.render_gauges("juansource_evidence_corpus", corpus.stats(), "Local evidence corpus")
+    lines += metrics.render_gauges("juansource_in_flight", in_flight_stats(), "Coalesced in-flight checks")
+    lines += metrics.render_gauges("juansource_cascade", cascade_stats(), "Auto mode answers by tier")
+    lines += metrics.render_gauges("juansource_prefilter", prefilter_stats(), "Claim pre-filter outcomes")
+    history = ensure_history()
+    if history is not None:
+        lines += metrics.render_gauges("juansource_history", history.stats(), "Fact-check history writer")
+    ollama = loaded_engine("ollama")
+    nodes = ollama.ensure_pool().stats() if ollama is not None else []
+    for key, description in (("healthy", "1 if the node passed its last check"), ("in_flight", "Requests running"),
+                             ("requests", "Requests routed"), ("failures", "Failed requests")):
+        lines += metrics.render_labelled_gauges(
+            f"juansource_ollama_node_{key}", f"Ollama node: {description}.", "node",
+            {node["base_url"]: int(node[key]) for node in nodes},
+        )
+    lines += metrics.render_labelled_gauges(
+        "juansource_engine_ready", "1 if the engine is loaded, warm and healthy.", "engine",
+        {name: int(state["ready"]) for name, state in engines.readiness()["engines"].items()},
+    )
+    for engine, stats in admission_stats().items():
+        lines += metrics.render_gauges(f"juansource_{engine}_admission", stats, f"{engine} LLM admission queue")
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
@@ -0,0 +1,153 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Optional
+
+_trace_id = contextvars.ContextVar("trace_id", default=None)
+_request_stages = contextvars.ContextVar("request_stages", default=None)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+def new_trace_id(value: Optional[str] = None) -> str:
+    """Start a trace for the current request, reusing a caller-supplied ID when given."""
+    trace_id = (value or "").strip()[:64] or uuid.uuid4().hex
+    _trace_id.set(trace_id)
+    _request_stages.set({})
+    return trace_id
+
+def current_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+def request_stages() -> dict:
+    """Stage values observed so far for the current request, summed when a stage repeats."""
+    return dict(_request_stages.get() or {})
+
+def _stage_logs_enabled() -> bool:
+    return os.getenv("STAGE_LOGS", "1").lower() not in ("0", "false", "no")
+
+def log_stage(stage: str, engine: str, model: str, **fields):
+    """One JSON line per pipeline stage, tagged with the request's trace ID."""
+    if _stage_logs_enabled():
+        print(json.dumps({"trace_id": current_trace_id(), "stage": stage, "engine": engine, "model": model, **fields}))
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class Histogram:
+    """Cumulative Prometheus-style histogram keyed by ``(engine, model)``."""
+
+    def __init__(self, name: str, description: str, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value: float, engine: str, model: str):
+        with self._lock:
+            series = self._series.get((engine, model))
+            if series is None:
+                series = self._series[(engine, model)] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0}
+            series["counts"][bisect_left(self.buckets, value)] += 1
+            series["sum"] += value
+
+    def totals(self) -> dict:
+        """``{(engine, model): (count, sum)}`` for every recorded series."""
+        with self._lock:
+            return {key: (sum(series["counts"]), series["sum"]) for key, series in self._series.items()}
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for (engine, model), series in sorted(self._series.items()):
+                labels = f'engine="{_escape(engine)}",model="{_escape(model)}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{labels},le="{_format_value(bound)}"}} {cumulative}')
+                cumulative += series["counts"][-1]
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+                lines.append(f"{self.name}_sum{{{labels}}} {series['sum']}")
+                lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+STAGES = {
+    "search": Histogram("juansource_search_seconds", "Evidence search latency, including cache hits.", LATENCY_BUCKETS),
+    "prompt_build": Histogram("juansource_prompt_build_seconds", "Time to pack evidence and format the prompt.", LATENCY_BUCKETS),
+    "prompt_chars": Histogram("juansource_prompt_chars", "Prompt size in characters.", SIZE_BUCKETS),
+    "prompt_tokens": Histogram("juansource_prompt_tokens", "Prompt size in tokens (estimated without tiktoken).", SIZE_BUCKETS),
+    "llm_first_token": Histogram("juansource_llm_first_token_seconds", "Time from sending the prompt to the first token.", LATENCY_BUCKETS),
+    "llm_total": Histogram("juansource_llm_seconds", "Total LLM generation time.", LATENCY_BUCKETS),
+    "parse": Histogram("juansource_parse_seconds", "Time to parse the model output.", LATENCY_BUCKETS),
+}
+
+def observe(stage: str, value: float, engine: str, model: str):
+    STAGES[stage].observe(value, engine, model)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages[stage] = round(stages.get(stage, 0) + value, 6)
+    log_stage(stage, engine, model, value=round(value, 6))
+
+@contextmanager
+def timed(stage: str, engine: str, model: str):
+    """Record the duration of the ``with`` block under ``stage``, even when it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start, engine, model)
+
+class GenerationTimer:
+    """Time-to-first-token and total generation time for one LLM call."""
+
+    def __init__(self, engine: str, model: str):
+        self.engine = engine
+        self.model = model
+        self.start = time.perf_counter()
+        self._first = None
+
+    def token(self):
+        if self._first is None:
+            self._first = time.perf_counter() - self.start
+            observe("llm_first_token", self._first, self.engine, self.model)
+
+    def done(self) -> float:
+        elapsed = time.perf_counter() - self.start
+        if self._first is None:
+            # Non-streaming clients deliver everything at once.
+            observe("llm_first_token", elapsed, self.engine, self.model)
+        observe("llm_total", elapsed, self.engine, self.model)
+        return elapsed
+
+def render_gauges(prefix: str, values: dict, description: str) -> list:
+    """Numeric entries of a stats dict as ``<prefix>_<key>`` gauges."""
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        name = f"{prefix}_{key}"
+        lines += [f"# HELP {name} {description} ({key}).", f"# TYPE {name} gauge", f"{name} {value}"]
+    return lines
+
+def render_labelled_gauges(name: str, description: str, label: str, values: dict) -> list:
+    """``{label_value: number}`` as one gauge with a series per label value."""
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} gauge"]
+    for label_value, value in values.items():
+        lines.append(f'{name}{{{label}="{_escape(label_value)}"}} {_format_value(value)}')
+    return lines
+
+def render() -> str:
+    """All stage histograms in Prometheus text exposition format."""
+    lines = []
+    for histogram in STAGES.values():
+        lines += histogram.render()
+    return "\n".join(lines) + "\n"
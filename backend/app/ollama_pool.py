@@ -0,0 +1,119 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+from .http_clients import ensure_async_client
+
+class OllamaNode:
+    """One Ollama server: its lazily built clients (one per model) plus routing and health state."""
+
+    def __init__(self, base_url: str, client_factory: Callable[[str, str], object]):
+        self.base_url = base_url
+        self._client_factory = client_factory
+        self._clients = {}
+        self.in_flight = 0
+        self.healthy = True  # optimistic until the first health check says otherwise
+        self.last_error: Optional[str] = None
+        self.last_checked: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+
+    def client(self, model: str):
+        if model not in self._clients:
+            self._clients[model] = self._client_factory(self.base_url, model)
+        return self._clients[model]
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "last_checked": self.last_checked,
+        }
+
+class OllamaPool:
+    """Routes generations to the healthy node with the fewest requests in flight.
+
+    A node that fails a request or a ``/api/tags`` health check is taken out of rotation
+    until a later health check succeeds.
+    """
+
+    def __init__(self, base_urls: List[str], client_factory: Callable[[str, str], object]):
+        if not base_urls:
+            raise RuntimeError("At least one Ollama base URL is required.")
+        self.nodes = [OllamaNode(url, client_factory) for url in base_urls]
+        self._lock = threading.Lock()
+
+    def acquire(self, exclude=()) -> Optional[OllamaNode]:
+        """Reserve the least-loaded node not in ``exclude``; unhealthy nodes are a last resort."""
+        with self._lock:
+            candidates = [node for node in self.nodes if node not in exclude]
+            if not candidates:
+                return None
+            healthy = [node for node in candidates if node.healthy]
+            # When every node looks down, still try one: a stale health mark must not cause an outage.
+            node = min(healthy or candidates, key=lambda n: (n.in_flight, n.requests))
+            node.in_flight += 1
+            node.requests += 1
+            return node
+
+    def release(self, node: OllamaNode):
+        with self._lock:
+            node.in_flight -= 1
+
+    def mark_failed(self, node: OllamaNode, error: Exception):
+        with self._lock:
+            node.healthy = False
+            node.failures += 1
+            node.last_error = str(error) or type(error).__name__
+
+    async def check(self, node: OllamaNode) -> bool:
+        try:
+            response = await ensure_async_client().get(f"{node.base_url}/api/tags", timeout=5.0)
+            healthy, error = response.status_code == 200, f"HTTP {response.status_code}"
+        except Exception as e:
+            healthy, error = False, str(e) or type(e).__name__
+        with self._lock:
+            if healthy != node.healthy:
+                print(f"{'✓' if healthy else '⚠️ '} Ollama node {node.base_url} is {'back up' if healthy else 'down'}.")
+            node.healthy = healthy
+            node.last_checked = time.time()
+            if not healthy:
+                node.last_error = error
+        return healthy
+
+    async def check_all(self):
+        await asyncio.gather(*(self.check(node) for node in self.nodes))
+
+    async def run_health_checks(self, interval: float):
+        """Re-check every node every ``interval`` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.check_all()
+
+    def stats(self) -> list:
+        with self._lock:
+            return [node.stats() for node in self.nodes]
+
+def configured_base_urls(default: str) -> List[str]:
+    """``OLLAMA_BASE_URLS`` as a comma-separated list, else the single ``default`` URL."""
+    urls = []
+    for url in (os.getenv("OLLAMA_BASE_URLS") or default).split(","):
+        url = url.strip().rstrip("/")
+        if url:
+            urls.append(url if url.startswith("http") else f"http://{url}")
+    return urls
+
+def configured_node_count() -> int:
+    """How many Ollama servers are configured (the default URL counts as one)."""
+    return len(configured_base_urls("")) or 1
+
+def health_check_interval() -> float:
+    try:
+        return float(os.getenv("OLLAMA_HEALTH_INTERVAL", "15"))
+    except ValueError:
+        raise RuntimeError("OLLAMA_HEALTH_INTERVAL must be a number if set.")
@@ -0,0 +1,216 @@
+import json
+import os
+import re
+from bisect import bisect_left
+
+# Section extraction. A section runs from its label to the next line that starts with "Word:".
+_LABEL_NAMES = ("classification", "reasoning", "evidence")
+_LABELS = re.compile(r"(?:(Classification)|(Reasoning)|(Evidence)):", re.IGNORECASE)
+_SECTION_BREAK = re.compile(r"\n(?=[A-Z][a-zA-Z]+:)", re.IGNORECASE)
+_LEADING_SPACE = re.compile(r"\s*")
+_EVIDENCE_URL = re.compile(r"https?://[^\s\"')]+")
+_CITATION = re.compile(r"\[(\d+)\]")
+_JSON_FENCE = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.IGNORECASE | re.DOTALL)
+
+# Structured-output mode: the model returns this JSON object instead of labelled sections.
+FACT_CHECK_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "classification": {"type": "string", "enum": ["REAL", "FAKE"]},
+        "reasoning": {"type": "string"},
+        "evidence": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["classification", "reasoning", "evidence"],
+}
+# Replaces the "FINAL OUTPUT FORMAT" block of a RAG prompt template (braces escaped for PromptTemplate).
+JSON_OUTPUT_FORMAT = """**FINAL OUTPUT FORMAT:**
+Respond with a single JSON object and nothing else:
+{{"classification": "REAL or FAKE", "reasoning": "Concise, evidence-based explanation.", "evidence": ["https://www.source-link-1.com/article", "https://www.source-link-2.com/news"]}}
+"""
+
+# Evidence blocks the model sometimes appends to its reasoning.
+_TRAILING_STARRED_EVIDENCE_ARRAY = re.compile(r"\*\*?EVIDENCE\*\*?:?\s*\[.*?\]\s*$", re.IGNORECASE | re.DOTALL)
+_TRAILING_EVIDENCE_ARRAY = re.compile(r"EVIDENCE:?\s*\[.*?\]\s*$", re.IGNORECASE | re.DOTALL)
+_TRAILING_STARRED_EVIDENCE = re.compile(r"\*\*?EVIDENCE\*\*?:?\s*.*$", re.IGNORECASE | re.DOTALL)
+
+# Per-line tokens for the cleanup pass.
+_EVIDENCE_MARKER = re.compile(r"\*\*?EVIDENCE\*\*?:?", re.IGNORECASE)
+_EVIDENCE_HEADING = re.compile(r"^\s*EVIDENCE:?\s*$", re.IGNORECASE)
+_ASTERISK_LINE = re.compile(r"^\s*\*+\s*$")
+_STANDALONE_ARTIFACT = re.compile(
+    r"""^\s*(?:https?://|\d+\.\s*["']?https?://|[\[\]]\s*$|\*+\s*$|["']https?://)"""
+)
+
+# Final touch-ups, applied in order.
+_EVIDENCE_MARKER_SPACE = re.compile(r"\*\*?EVIDENCE\*\*?:?\s*", re.IGNORECASE)
+_EVIDENCE_WORD = re.compile(r"EVIDENCE:?\s*", re.IGNORECASE)
+_TRAILING_EMPTY_ARRAY = re.compile(r"\s*\[\s*\]\s*$")
+_TRAILING_OPEN_BRACKET = re.compile(r"\s*\[\s*$")
+_TRAILING_ASTERISKS = re.compile(r"\s*\*+\s*$")
+_TRAILING_QUOTED_URL = re.compile(r"""\s*["']https?://[^\s"']+["']\s*,?\s*$""", re.MULTILINE)
+_LEADING_BOLD = re.compile(r"^\s*\*\*\s*")
+_LEADING_STAR = re.compile(r"^\s*\*\s*")
+
+# Characters that re.IGNORECASE matches against ASCII letters but str.lower() does not map to them.
+_UNSAFE_FOLDS = ("\u0130", "\u0131", "\u017f")
+
+def _folded(text: str):
+    """``text.lower()`` when it lines up index-for-index with ``text`` under re.IGNORECASE, else None."""
+    if any(char in text for char in _UNSAFE_FOLDS):
+        return None
+    return text.lower()
+
+def _may_contain(text: str, word: str) -> bool:
+    """Cheap pre-check: False only if ``re.search(word, text, re.IGNORECASE)`` cannot match."""
+    folded = _folded(text)
+    return folded is None or word in folded
+
+def _sub_tail(pattern, text: str, charset: str) -> str:
+    """Apply an end-anchored ``pattern`` built only from ``charset`` and whitespace to the tail of ``text``."""
+    start = len(text)
+    while start and (text[start - 1] in charset or text[start - 1].isspace()):
+        start -= 1
+    return text[:start] + pattern.sub("", text[start:])
+
+def extract_sections(text: str) -> dict:
+    """Return the first Classification/Reasoning/Evidence section bodies in one scan of ``text``."""
+    breaks = [match.start() for match in _SECTION_BREAK.finditer(text)]
+    folded = _folded(text)
+    label_ends = {}
+    if folded is not None:
+        for label in _LABEL_NAMES:
+            position = folded.find(label + ":")
+            if position != -1:
+                label_ends[label] = position + len(label) + 1
+    else:
+        for match in _LABELS.finditer(text):
+            label_ends.setdefault(_LABEL_NAMES[match.lastindex - 1], match.end())
+
+    sections = {}
+    for label, label_end in label_ends.items():
+        start = _LEADING_SPACE.match(text, label_end).end()
+        index = bisect_left(breaks, start)
+        end = breaks[index] if index < len(breaks) else len(text)
+        sections[label] = text[start:end].strip()
+    return sections
+
+def normalise_classification(value: str) -> str:
+    lowered = (value or "").lower()
+    if any(token in lowered for token in ["real", "true", "verified"]):
+        return "real"
+    if any(token in lowered for token in ["fake", "false", "hoax"]):
+        return "fake"
+    return "unknown"
+
+def _warn_on_citation_overflow(reasoning: str, evidence: list):
+    citations_found = _CITATION.findall(reasoning)
+    if citations_found:
+        max_citation_in_text = max(int(c) for c in citations_found)
+        if max_citation_in_text > len(evidence):
+            print(f"   ⚠️  Warning: Reasoning references citation [{max_citation_in_text}] but only {len(evidence)} sources available. Citations may be incorrect.")
+
+def _strip_evidence_lines(lines: list) -> list:
+    """Drop evidence arrays, URLs and asterisk dividers from reasoning lines in a single pass."""
+    count = len(lines)
+    has_url = ["http://" in line or "https://" in line for line in lines]
+    check_markers = _may_contain("\n".join(lines), "evidence")
+    # next_url[i] is the index of the first line after i containing a URL (or ``count``).
+    next_url = [count] * count
+    upcoming = count
+    for i in range(count - 1, -1, -1):
+        next_url[i] = upcoming
+        if has_url[i]:
+            upcoming = i
+
+    cleaned_lines = []
+    in_evidence_section = False
+    bracket_count = 0
+    for i, line in enumerate(lines):
+        if check_markers and (_EVIDENCE_MARKER.search(line) or _EVIDENCE_HEADING.search(line)):
+            in_evidence_section = True
+            bracket_count = 0
+            continue
+
+        # A divider such as "****" followed by URLs within four lines opens an evidence block.
+        if not in_evidence_section and line.count("*") >= 3 and next_url[i] < min(i + 5, count):
+            in_evidence_section = True
+            bracket_count = 0
+            continue
+
+        if in_evidence_section:
+            bracket_count += line.count("[") - line.count("]")
+            if bracket_count > 0 or has_url[i] or _ASTERISK_LINE.match(line):
+                continue
+            if bracket_count == 0:
+                # Either the array just closed or the block ran out of URLs; the block stays
+                # open only while a bracket-free line is immediately followed by another URL.
+                if "]" in line or i + 1 >= count or not has_url[i + 1]:
+                    in_evidence_section = False
+                continue
+
+        if _STANDALONE_ARTIFACT.match(line):
+            continue
+        cleaned_lines.append(line)
+    return cleaned_lines
+
+def clean_reasoning(reasoning: str) -> str:
+    """Remove evidence lists, URLs and markdown debris the model leaks into its reasoning."""
+    if _may_contain(reasoning, "evidence"):
+        reasoning = _TRAILING_STARRED_EVIDENCE_ARRAY.sub("", reasoning)
+        reasoning = _TRAILING_EVIDENCE_ARRAY.sub("", reasoning)
+        reasoning = _TRAILING_STARRED_EVIDENCE.sub("", reasoning)
+    reasoning = "\n".join(_strip_evidence_lines(reasoning.split("\n"))).strip()
+    if _may_contain(reasoning, "evidence"):
+        reasoning = _EVIDENCE_MARKER_SPACE.sub("", reasoning)
+        reasoning = _EVIDENCE_WORD.sub("", reasoning)
+    reasoning = _sub_tail(_TRAILING_EMPTY_ARRAY, reasoning, "[]")
+    reasoning = _sub_tail(_TRAILING_OPEN_BRACKET, reasoning, "[")
+    reasoning = _sub_tail(_TRAILING_ASTERISKS, reasoning, "*")
+    if "'http" in reasoning or '"http' in reasoning:
+        reasoning = _TRAILING_QUOTED_URL.sub("", reasoning)
+    reasoning = _LEADING_BOLD.sub("", reasoning)
+    return _LEADING_STAR.sub("", reasoning)
+
+def structured_output_enabled() -> bool:
+    return os.getenv("STRUCTURED_OUTPUT", "0").lower() in ("1", "true", "yes")
+
+def parse_structured_output(raw: str):
+    """Parse a structured-output JSON answer into ``(classification, reasoning, evidence)``.
+
+    Returns None when ``raw`` is not a JSON object of the expected shape, so callers can fall
+    back to :func:`parse_fact_check_output`.
+    """
+    text = raw.strip()
+    fenced = _JSON_FENCE.match(text)
+    if fenced:
+        text = fenced.group(1)
+    if not text.startswith("{"):
+        return None
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    classification = data.get("classification")
+    reasoning = data.get("reasoning")
+    evidence = data.get("evidence", [])
+    if not isinstance(classification, str) or not isinstance(reasoning, str) or not isinstance(evidence, list):
+        return None
+    urls = [url for item in evidence if isinstance(item, str) for url in _EVIDENCE_URL.findall(item)]
+    return normalise_classification(classification), reasoning.strip() or text, urls
+
+def parse_fact_check_output(raw: str, clean: bool = True):
+    """Split raw model output into ``(classification, reasoning, evidence)``.
+
+    With ``clean`` set, evidence artifacts are stripped from the reasoning text and citations
+    beyond the number of evidence links are reported.
+    """
+    sections = extract_sections(raw)
+    reasoning = sections.get("reasoning", "")
+    evidence = _EVIDENCE_URL.findall(sections.get("evidence", ""))
+    if clean and reasoning:
+        if evidence:
+            _warn_on_citation_overflow(reasoning, evidence)
+        reasoning = clean_reasoning(reasoning)
+    return normalise_classification(sections.get("classification", "")), reasoning or raw.strip(), evidence
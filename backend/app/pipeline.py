@@ -0,0 +1,357 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from .admission import Overloaded, ensure_admission
+from .cache import ensure_result_cache, normalize_claim
+from .concurrency import SingleFlight, run_blocking
+from .engines import load_engine, loaded_engine
+from .evidence import token_budget
+from .history import ensure_history
+from .metrics import current_trace_id, request_stages
+from .parsing import normalise_classification
+from .prefilter import NotAClaim, prepare_claims
+from .search import count_results, search_error
+from .semantic import aensure_semantic_index
+from .urls import url_key
+
+_in_flight = SingleFlight()
+
+async def _flight_key(engine: str, claim: str):
+    module = await load_engine(engine)
+    return engine, module.model_name(), normalize_claim(claim)
+
+def in_flight_stats() -> dict:
+    return _in_flight.stats()
+
+@asynccontextmanager
+async def _slot(semaphore):
+    if semaphore is None:
+        yield
+        return
+    async with semaphore:
+        yield
+
+def _lease_settings():
+    try:
+        return float(os.getenv("SHARED_LEASE_TTL", "120")), float(os.getenv("SHARED_LEASE_POLL", "0.2"))
+    except ValueError:
+        raise RuntimeError("SHARED_LEASE_TTL and SHARED_LEASE_POLL must be numbers if set.")
+
+@asynccontextmanager
+async def _worker_lease(engine: str, model: str, claim: str):
+    """Coalesce across server processes that share ``RESULT_CACHE_DB``.
+
+    Yields the verdict another worker computed while this one waited, or None once this
+    worker holds the lease and should compute it; the lease is released on exit.
+    """
+    cache = ensure_result_cache()
+    if not cache.shared:
+        yield None
+        return
+    ttl, poll = _lease_settings()
+    # Every SQLite call goes through the worker pool: a busy shared file must not stall the event loop.
+    while not await run_blocking(cache.acquire_lease, engine, model, claim, ttl):
+        await asyncio.sleep(poll)
+        cached = await cache.get(engine, model, claim, count_miss=False)
+        if cached is not None:
+            yield {**cached, "cached": True}
+            return
+    try:
+        yield None
+    finally:
+        await run_blocking(cache.release_lease, engine, model, claim)
+
+async def _lookup(engine: str, claim: str):
+    """Return ``(cached_result, similar_entry)``: a reusable verdict, else evidence from a similar claim."""
+    model = (await load_engine(engine)).model_name()
+    cached = await ensure_result_cache().get(engine, model, claim)
+    if cached is not None:
+        return {**cached, "cached": True}, None
+    index = await aensure_semantic_index()
+    if index is None:
+        return None, None
+    verdict, similar = await run_blocking(index.lookup, claim, engine, model)
+    if verdict is None:
+        return None, similar
+    print(f"   Reusing verdict for similar claim '{verdict['claim']}' (similarity {verdict['score']:.2f})")
+    return {**verdict["result"], "cached": True, "matched_claim": verdict["claim"]}, None
+
+async def lookup_cached(engine: str, claim: str) -> Optional[dict]:
+    """A stored verdict for ``claim``: exact normalized match first, then a semantic near-duplicate."""
+    cached, _ = await _lookup(engine, claim)
+    return cached
+
+async def remember(engine: str, claim: str, result: dict, search_results=None):
+    model = (await load_engine(engine)).model_name()
+    await ensure_result_cache().set(engine, model, claim, result)
+    index = await aensure_semantic_index()
+    if index is not None:
+        await run_blocking(index.add, claim, engine, model, result, search_results)
+
+async def join_in_flight(engine: str, claim: str) -> Optional[dict]:
+    """The result of an identical check already running, or None if there is none to join."""
+    joined, result = await _in_flight.join(await _flight_key(engine, claim))
+    return dict(result) if joined else None
+
+async def check_claim(engine: str, claim: str, search_slots=None, llm_slots=None) -> dict:
+    """Run one claim through the caches and, on a miss, the engine's search and reasoning stages.
+
+    Concurrent calls for the same normalized claim and engine share one computation.
+    Optional semaphores bound how many searches and LLM calls run at once (used by batches).
+    Returns the engine's result dict, or ``{"error": ...}``; raises :class:`Overloaded` when
+    the engine's LLM queue turns the request away and :class:`EngineUnavailable` when the
+    engine is disabled or cannot be loaded.
+    """
+    if not claim.strip():
+        return {"error": "Claim must not be empty."}
+    result = await _in_flight.run(
+        await _flight_key(engine, claim),
+        lambda: _check_claim(engine, claim, search_slots, llm_slots),
+    )
+    # Callers share one result dict; give each its own copy.
+    return dict(result)
+
+async def _check_claim(engine: str, claim: str, search_slots, llm_slots) -> dict:
+    module = await load_engine(engine)
+    cached, similar = await _lookup(engine, claim)
+    if cached is not None:
+        return cached
+    async with _worker_lease(engine, module.model_name(), claim) as shared:
+        if shared is not None:
+            return shared
+        return await _compute_claim(module, engine, claim, similar, search_slots, llm_slots)
+
+async def _compute_claim(module, engine: str, claim: str, similar, search_slots, llm_slots) -> dict:
+    # Fail fast before spending a search on a request the model queue would reject anyway.
+    admission = ensure_admission(engine)
+    admission.check()
+
+    print(f"1. Verifying Claim: '{claim}'")
+    search_results = None
+    if similar is not None:
+        print(f"   Reusing search evidence from similar claim '{similar['claim']}' (similarity {similar['score']:.2f})")
+        search_results = similar["search_results"]
+    else:
+        try:
+            async with _slot(search_slots):
+                search_results = await module.asearch_evidence(claim)
+        except Exception as e:
+            print(f"Error during Google Search: {e}")
+            return {"error": search_error(e)}
+
+    async with _slot(llm_slots), admission.slot():
+        result = await module.areason(claim, search_results)
+    if "error" not in result:
+        await remember(engine, claim, result, search_results)
+    return result
+
+def _record(engine: str, claim: str, result: dict, start: float):
+    """Queue an answer for the history store (a deque append; the write happens later)."""
+    history = ensure_history()
+    if history is None or "error" in result:
+        return
+    module = loaded_engine(engine)
+    model = result.get("answered_by") or (module.model_name() if module is not None else None)
+    history.record(engine, model, claim, result, time.perf_counter() - start, current_trace_id(), request_stages())
+
+async def stream_claim(engine: str, claim: str):
+    """Yield ``(event, data)`` pairs for a streamed check: stages, tokens, then the result or an error.
+
+    Cached verdicts and identical checks already running are answered with a single result
+    event. Raises :class:`Overloaded` before the first event when the LLM queue is full, so the
+    endpoint can still answer with an HTTP error instead of an empty stream.
+    """
+    if not claim.strip():
+        yield "error", {"error": "Claim must not be empty."}
+        return
+    start = time.perf_counter()
+    module = await load_engine(engine)
+    cached, similar = await _lookup(engine, claim)
+    if cached is None:
+        cached = await join_in_flight(engine, claim)
+    if cached is not None and "error" not in cached:
+        _record(engine, claim, cached, start)
+        yield "result", cached
+        return
+    admission = ensure_admission(engine)
+    admission.check()
+
+    print(f"1. Verifying Claim: '{claim}'")
+    yield "stage", {"stage": "search_started"}
+    if similar is not None:
+        print(f"   Reusing search evidence from similar claim '{similar['claim']}' (similarity {similar['score']:.2f})")
+        search_results = similar["search_results"]
+    else:
+        try:
+            search_results = await module.asearch_evidence(claim)
+        except Exception as e:
+            print(f"Error during Google Search: {e}")
+            yield "error", {"error": search_error(e)}
+            return
+    yield "stage", {"stage": "search_done", "evidence_count": count_results(search_results)}
+
+    position = admission.queue_position()
+    if position:
+        yield "stage", {"stage": "queued", "position": position, "estimated_wait": round(admission.estimated_wait(position), 1)}
+    try:
+        async with admission.slot():
+            async for event, data in module.astream_reason(claim, search_results):
+                if event == "result":
+                    await remember(engine, claim, data, search_results)
+                    _record(engine, claim, data, start)
+                yield event, data
+    except Overloaded as e:
+        yield "error", {"error": str(e), "status_code": e.status_code, "retry_after": e.retry_after}
+
+# How strongly each verdict flags a multi-claim paste: one fake sentence makes the whole paste suspect.
+_SEVERITY = {"real": 0, "unknown": 1, "fake": 2}
+
+async def check_text(engine: str, check, text: str) -> dict:
+    """Screen raw input with the pre-filter, then run ``check`` on the claim, or on each claim of a paste.
+
+    Answers are recorded in the history under ``engine``. Raises :class:`NotAClaim` for input
+    that is not worth a search.
+    """
+    start = time.perf_counter()
+    prepared = prepare_claims(text)
+    if prepared["rejected"]:
+        raise NotAClaim(prepared["rejected"])
+    claims = prepared["claims"]
+    if len(claims) == 1:
+        result = await check(claims[0])
+        _record(engine, claims[0], result, start)
+        return result
+    print(f"   Split input into {len(claims)} claims ({prepared['dropped']} sentences skipped).")
+    result = await check_claims(check, claims)
+    for item in result.get("claims", []):
+        if "result" in item:
+            _record(engine, item["claim"], item["result"], start)
+    return result
+
+async def check_claims(check, claims: list) -> dict:
+    """Run ``check`` on the claims split from one paste concurrently and combine the results.
+
+    The combined classification is the most severe sub-verdict (a sub-claim that failed
+    counts as unknown), the reasoning lists each claim's own reasoning and the evidence is the
+    union of their sources; ``claims`` keeps each ``{"claim", "result"|"error"}`` item.
+    """
+    outcomes = await asyncio.gather(*(check(claim) for claim in claims), return_exceptions=True)
+    items = []
+    for claim, outcome in zip(claims, outcomes):
+        if isinstance(outcome, BaseException):
+            outcome = {"error": str(outcome) or type(outcome).__name__}
+        items.append({"claim": claim, "error": outcome["error"]} if "error" in outcome else {"claim": claim, "result": outcome})
+    results = [item["result"] for item in items if "result" in item]
+    if not results:
+        # Nothing was checked: surface the first failure as is (e.g. Overloaded keeps its 429/503).
+        first = outcomes[0]
+        if isinstance(first, Exception):
+            raise first
+        return {"error": items[0]["error"]}
+
+    verdicts = [normalise_classification(result["classification"]) for result in results]
+    if len(results) < len(items):
+        verdicts.append("unknown")
+    sections, evidence = [], []
+    for number, item in enumerate(items, 1):
+        body = item["result"]["reasoning"] if "result" in item else f"Could not be checked: {item['error']}"
+        sections.append(f"Claim {number}: {item['claim']}\n{body}")
+        evidence += [url for url in item.get("result", {}).get("evidence", []) if url not in evidence]
+    return {
+        "classification": max(verdicts, key=_SEVERITY.get),
+        "reasoning": "\n\n".join(sections),
+        "evidence": evidence,
+        "raw": "",
+        "cached": all(result.get("cached") for result in results) and len(results) == len(items),
+        "claims": items,
+    }
+
+_cascade_stats = {"fast": 0, "escalated": 0, "cached": 0}
+
+def _cascade_settings():
+    escalate_to = os.getenv("CASCADE_ESCALATE_TO", "gemini").lower()
+    if escalate_to not in ("gemini", "ollama"):
+        raise RuntimeError("CASCADE_ESCALATE_TO must be 'gemini' or 'ollama' if set.")
+    fast_model = os.getenv("CASCADE_FAST_MODEL", "llama3.2:1b")
+    return fast_model, token_budget("CASCADE_FAST_EVIDENCE_TOKENS", 300), escalate_to
+
+def cascade_stats() -> dict:
+    return dict(_cascade_stats)
+
+def escalation_reason(result: dict, search_results) -> Optional[str]:
+    """Why a fast-tier answer cannot be trusted as is, or None when it can."""
+    if "error" in result:
+        return "fast tier failed"
+    if normalise_classification(result.get("classification")) == "unknown":
+        return "uncertain classification"
+    if not result.get("evidence"):
+        return "no evidence cited"
+    searched = {
+        url_key(item["link"]) for item in (search_results if isinstance(search_results, list) else [])
+        if isinstance(item, dict) and item.get("link")
+    }
+    if not searched & {url_key(url) for url in result["evidence"]}:
+        return "cited evidence not in search results"
+    return None
+
+async def check_claim_auto(claim: str) -> dict:
+    """Answer with a small Ollama model and escalate to the full engine only when the answer is doubtful.
+
+    The result records the ``tier`` that answered, the ``answered_by`` engine and model and,
+    when escalated, the ``escalation_reason``.
+    """
+    if not claim.strip():
+        return {"error": "Claim must not be empty."}
+    fast_model, _, _ = _cascade_settings()
+    result = await _in_flight.run(("auto", fast_model, normalize_claim(claim)), lambda: _check_claim_auto(claim))
+    return dict(result)
+
+async def _check_claim_auto(claim: str) -> dict:
+    fast_model, evidence_tokens, escalate_to = _cascade_settings()
+    cache = ensure_result_cache()
+    cached = await cache.get("cascade", fast_model, claim)
+    if cached is not None:
+        _cascade_stats["cached"] += 1
+        return {**cached, "cached": True}
+    async with _worker_lease("cascade", fast_model, claim) as shared:
+        if shared is not None:
+            _cascade_stats["cached"] += 1
+            return shared
+        return await _answer_auto(claim, fast_model, evidence_tokens, escalate_to)
+
+async def _answer_auto(claim: str, fast_model: str, evidence_tokens: int, escalate_to: str) -> dict:
+    fast_engine = await load_engine("ollama")
+    print(f"1. Verifying Claim (auto): '{claim}'")
+    try:
+        search_results = await fast_engine.asearch_evidence(claim)
+    except Exception as e:
+        print(f"Error during Google Search: {e}")
+        return {"error": search_error(e)}
+
+    try:
+        async with ensure_admission("ollama").slot():
+            fast = await fast_engine.areason(claim, search_results, model=fast_model, evidence_tokens=evidence_tokens)
+        reason = escalation_reason(fast, search_results)
+    except Overloaded:
+        reason = "fast tier busy"
+
+    if reason is None:
+        _cascade_stats["fast"] += 1
+        result = {**fast, "tier": "fast", "answered_by": f"ollama:{fast_model}"}
+    else:
+        print(f"   Escalating to {escalate_to}: {reason}")
+        # The full engine finds the same search results in the search cache.
+        result = await check_claim(escalate_to, claim)
+        if "error" in result:
+            return result
+        _cascade_stats["escalated"] += 1
+        result = {
+            **result,
+            "tier": "escalated",
+            "answered_by": f"{escalate_to}:{(await load_engine(escalate_to)).model_name()}",
+            "escalation_reason": reason,
+        }
+    await ensure_result_cache().set("cascade", fast_model, claim, result)
+    return result
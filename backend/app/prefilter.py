@@ -0,0 +1,191 @@
+"""CPU-only screening of user input before any search or model call.
+
+Normalizes and truncates the text, turns away input that is not a checkable claim
+(greetings, single words, bare links, text in an unsupported script) and splits pasted
+lists or long passages into separate sentence-sized claims.
+"""
+import os
+import re
+import unicodedata
+from .cache import normalize_claim
+
+_INVISIBLE = re.compile("[\u200b\u200c\u200d\u2060\ufeff]")
+_SPACES = re.compile(r"[^\S\n]+")
+_URL = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+_WORD = re.compile(r"[^\W\d_]+(?:['’-][^\W\d_]+)*", re.UNICODE)
+_BULLET = re.compile(r"^\s*(?:[-*•▪◦]+|\d{1,2}[.)])\s+")
+# A sentence ends at . ! or ? followed by whitespace and something that can start a sentence.
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"”’')\]]*\s+(?=[\"“‘'(\[]?[A-Z0-9])")
+_QUOTES = "\"'“”‘’«»"
+_LINE_END = re.compile(r"[.!?][\"”’')\]]*$")
+
+# Abbreviations that end in a period without ending the sentence ("Sen. Cruz said ...").
+_ABBREVIATIONS = frozenset(
+    "sen rep gov pres vp sec gen col lt sgt atty engr dr mr mrs ms st jr sr no vs mt ft dept univ inc corp co".split()
+)
+
+# Input made only of these words is small talk or a test, not something to fact-check.
+_FILLER = frozenset(
+    "hi hello hey yo good morning afternoon evening night thanks thank you ty ok okay k test testing "
+    "lol haha hahaha please pls po kumusta kamusta musta salamat maraming magandang umaga hapon gabi "
+    "oo opo hindi sige ano what why how huh check this fact is true real fake".split()
+)
+
+_ENGLISH = frozenset(
+    "the is are was were will be has have had of to in on for with that this not and or but by from "
+    "at as it they he she we said says".split()
+)
+_TAGALOG = frozenset(
+    "ang ng mga sa na ay si ni kay hindi po ba daw raw nang ito iyan yung yan dito doon siya sila kami "
+    "tayo namin natin niya nila may wala para pero kung dahil lang din rin mag nag".split()
+)
+
+class NotAClaim(ValueError):
+    """Input turned away by the pre-filter; the endpoints answer it with HTTP 422."""
+
+_stats = {"checked": 0, "rejected": 0, "split": 0, "truncated": 0}
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        raise RuntimeError(f"{name} must be an integer if set.")
+
+def prefilter_enabled() -> bool:
+    return os.getenv("CLAIM_PREFILTER", "1").lower() not in ("0", "false", "no")
+
+def prefilter_stats() -> dict:
+    return dict(_stats)
+
+def normalize_text(text: str) -> str:
+    """NFKC-fold, drop invisible characters and collapse runs of spaces (line breaks are kept)."""
+    text = _INVISIBLE.sub("", unicodedata.normalize("NFKC", text or ""))
+    lines = [_SPACES.sub(" ", line).strip() for line in text.splitlines()]
+    return "\n".join(line for line in lines if line)
+
+def _strip_quotes(text: str) -> str:
+    text = text.strip()
+    while len(text) > 1 and text[0] in _QUOTES and text[-1] in _QUOTES:
+        text = text[1:-1].strip()
+    return text
+
+def truncate(text: str, max_chars: int) -> str:
+    """Cut ``text`` to at most ``max_chars``, at a word boundary when there is one."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > max_chars // 2 else cut).rstrip(" ,;:-")
+
+def detect_language(text: str) -> str:
+    """``en`` or ``tl`` by stopword counts (Taglish counts as ``tl``), ``other`` for mostly non-Latin script."""
+    letters = [ch for ch in text if ch.isalpha()]
+    if not letters:
+        return "other"
+    latin = sum(1 for ch in letters if ord(ch) < 0x250)
+    if latin / len(letters) < 0.5:
+        return "other"
+    words = [word.lower() for word in _WORD.findall(text)]
+    english = sum(1 for word in words if word in _ENGLISH)
+    tagalog = sum(1 for word in words if word in _TAGALOG)
+    return "tl" if tagalog > english else "en"
+
+def rejection_reason(text: str, min_words: int) -> str:
+    """Why ``text`` is not a checkable claim, or an empty string if it is."""
+    without_links = _URL.sub(" ", text)
+    words = _WORD.findall(without_links)
+    if not words:
+        return "Please paste the claim itself, not just a link." if _URL.search(text) else "There is no text to check."
+    if detect_language(without_links) == "other":
+        return "Only English and Filipino claims are supported."
+    if all(word.lower() in _FILLER for word in words):
+        return "That doesn't look like a claim. Enter a statement to fact-check."
+    if len(words) < min_words:
+        return f"The claim is too short to check. Enter a full statement (at least {min_words} words)."
+    return ""
+
+def _paragraphs(text: str) -> list:
+    """Rejoin wrapped lines: a line break only ends a claim after sentence punctuation or before a list item."""
+    paragraphs, current = [], []
+    for line in text.split("\n"):
+        item = _BULLET.match(line)
+        if item and current:
+            paragraphs.append(" ".join(current))
+            current = []
+        current.append(_BULLET.sub("", line) if item else line)
+        if _LINE_END.search(line):
+            paragraphs.append(" ".join(current))
+            current = []
+    if current:
+        paragraphs.append(" ".join(current))
+    return paragraphs
+
+def _sentences(paragraphs: list) -> list:
+    pieces = []
+    for paragraph in paragraphs:
+        for sentence in _SENTENCE_END.split(paragraph):
+            sentence = sentence.strip()
+            if not sentence:
+                continue
+            previous = pieces[-1] if pieces else ""
+            last_word = previous.rstrip(".").rsplit(" ", 1)[-1].lower() if previous.endswith(".") else ""
+            if last_word in _ABBREVIATIONS or len(last_word) == 1:
+                pieces[-1] = f"{previous} {sentence}"  # "Sen." or an initial, not a sentence end
+            else:
+                pieces.append(sentence)
+    return pieces
+
+def prepare_claims(text: str) -> dict:
+    """Screen raw input.
+
+    Returns ``{"claims", "rejected", "language", "truncated", "dropped"}``: the claims to
+    check (several when a list or long passage was pasted), or an empty list and the reason
+    in ``rejected``. ``dropped`` counts sentences left out as not checkable, duplicates or
+    over the ``CLAIM_MAX_SPLIT`` limit. With ``CLAIM_PREFILTER=0`` only empty input is rejected.
+    """
+    if not prefilter_enabled():
+        claims = [text] if text and text.strip() else []
+        return {"claims": claims, "rejected": None if claims else "Claim must not be empty.",
+                "language": None, "truncated": False, "dropped": 0}
+    max_chars = _int_env("CLAIM_MAX_CHARS", 500)
+    min_words = _int_env("CLAIM_MIN_WORDS", 2)
+    max_split = _int_env("CLAIM_MAX_SPLIT", 5)
+
+    text = normalize_text(text)
+    prepared = {"claims": [], "rejected": None, "language": detect_language(text), "truncated": False, "dropped": 0}
+    if not text:
+        prepared["rejected"] = "Claim must not be empty."
+        _stats["checked"] += 1
+        _stats["rejected"] += 1
+        return prepared
+
+    # A short single paragraph is one claim, even with several sentences; split lists and long pastes.
+    paragraphs = _paragraphs(text)
+    if len(paragraphs) == 1 and len(paragraphs[0]) <= max_chars:
+        candidates = paragraphs
+    else:
+        candidates = _sentences(paragraphs)
+
+    seen, first_reason = set(), ""
+    for candidate in candidates:
+        candidate = _strip_quotes(candidate)
+        reason = rejection_reason(candidate, min_words)
+        key = normalize_claim(candidate)
+        if reason or key in seen or len(prepared["claims"]) >= max_split:
+            first_reason = first_reason or reason
+            prepared["dropped"] += 1
+            continue
+        seen.add(key)
+        if len(candidate) > max_chars:
+            candidate = truncate(candidate, max_chars)
+            prepared["truncated"] = True
+        prepared["claims"].append(candidate)
+
+    if not prepared["claims"]:
+        prepared["rejected"] = first_reason or "There is no checkable claim in the text."
+        prepared["dropped"] = 0
+    _stats["checked"] += 1
+    _stats["rejected"] += prepared["rejected"] is not None
+    _stats["split"] += len(prepared["claims"]) > 1
+    _stats["truncated"] += prepared["truncated"]
+    return prepared
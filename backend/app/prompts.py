@@ -0,0 +1,68 @@
+"""Prompt layouts shared by both engines.
+
+Each engine keeps its own ``RAG_PROMPT_TEMPLATE``; :class:`PromptSet` renders it in one of two
+layouts, chosen with ``PROMPT_LAYOUT``:
+
+- ``legacy``: the template as one user message, with the claim and evidence in the middle.
+- ``system``: the fixed header, instructions and output format as a constant system message,
+  followed by a user message holding only the claim and evidence. Every request then starts
+  with the same tokens, so Ollama can reuse the already-evaluated prefix from its KV cache
+  (and Gemini's implicit prefix caching can apply) instead of re-reading the instructions.
+"""
+import os
+from typing import Union
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.prompts import PromptTemplate
+from .parsing import JSON_OUTPUT_FORMAT
+
+LAYOUTS = ("legacy", "system")
+
+_VARIABLE_START = "**1. QUERY/CLAIM TO VERIFY:**"
+_INSTRUCTIONS_START = "**INSTRUCTIONS FOR REASONING:**"
+_OUTPUT_START = "**FINAL OUTPUT FORMAT:**"
+_USER_NOTE = "The user's message holds the QUERY/CLAIM TO VERIFY and the RETRIEVED EVIDENCE (Search Results)."
+
+def prompt_layout() -> str:
+    layout = os.getenv("PROMPT_LAYOUT", "legacy").strip().lower()
+    if layout not in LAYOUTS:
+        raise RuntimeError("PROMPT_LAYOUT must be 'legacy' or 'system' if set.")
+    return layout
+
+def prompt_text(prompt) -> str:
+    """The full text of a prompt in either layout, for size metrics and logging."""
+    if isinstance(prompt, str):
+        return prompt
+    return "\n\n".join(message.content for message in prompt)
+
+class PromptSet:
+    """One engine's fact-check prompt in both layouts, with and without the JSON output format."""
+
+    def __init__(self, template: str):
+        head, rest = template.split(_VARIABLE_START, 1)
+        variables, instructions = rest.split(_INSTRUCTIONS_START, 1)
+        instructions = _INSTRUCTIONS_START + instructions
+        json_template = template.split(_OUTPUT_START)[0] + JSON_OUTPUT_FORMAT
+        json_instructions = instructions.split(_OUTPUT_START)[0] + JSON_OUTPUT_FORMAT
+        self._legacy = {
+            False: PromptTemplate.from_template(template),
+            True: PromptTemplate.from_template(json_template),
+        }
+        # Built once and sent verbatim; format() only resolves the {{ }} escapes of the JSON example.
+        self._system = {
+            False: f"{head.strip()}\n{_USER_NOTE}\n\n{instructions.strip()}\n".format(),
+            True: f"{head.strip()}\n{_USER_NOTE}\n\n{json_instructions.strip()}\n".format(),
+        }
+        self._user = PromptTemplate.from_template(f"{_VARIABLE_START}{variables.rstrip()}\n")
+
+    def system_message(self, structured: bool = False) -> str:
+        return self._system[structured]
+
+    def build(self, claim: str, evidence: str, structured: bool = False, layout: str = None) -> Union[str, list]:
+        """The prompt for ``claim``: a string in the ``legacy`` layout, else ``[system, user]`` messages."""
+        layout = layout or prompt_layout()
+        if layout == "legacy":
+            return self._legacy[structured].format(query=claim, search_results=evidence)
+        return [
+            SystemMessage(content=self._system[structured]),
+            HumanMessage(content=self._user.format(query=claim, search_results=evidence)),
+        ]
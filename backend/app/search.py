@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+import httpx
+from .cache import normalize_claim
+from .concurrency import run_blocking
+from .corpus import aensure_corpus
+from .http_clients import ensure_async_client
+from .urls import url_key
+
+GOOGLE_CSE_URL = "https://www.googleapis.com/customsearch/v1"
+NO_RESULTS = [{"Result": "No good Google Search Result was found"}]
+
+# Custom Search bills per query and returns at most 10 items, so always fetch the full
+# page once and serve smaller ``num_results`` requests from it.
+FETCH_SIZE = 10
+
+def _credentials():
+    api_missing = [key for key in ('GOOGLE_API_KEY', 'GOOGLE_CSE_ID') if not os.getenv(key)]
+    if api_missing:
+        raise RuntimeError(
+            f"Missing Google Custom Search credentials: {', '.join(api_missing)}. "
+            "Set them in your environment or .env file."
+        )
+    return os.getenv('GOOGLE_API_KEY'), os.getenv('GOOGLE_CSE_ID')
+
+def _to_results(items) -> list:
+    """Shape raw CSE items the same way ``GoogleSearchAPIWrapper.results`` does."""
+    if not items:
+        return list(NO_RESULTS)
+    results = []
+    for item in items:
+        result = {"title": item.get("title", ""), "link": item.get("link", "")}
+        if "snippet" in item:
+            result["snippet"] = item["snippet"]
+        results.append(result)
+    return results
+
+def search_error(e: Exception) -> str:
+    """What to tell the client about a failed search; the full error (with the request URL) stays in the server log."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return f"Google Search failed (HTTP {e.response.status_code})."
+    if isinstance(e, httpx.HTTPError):
+        return "Could not reach Google Search."
+    return str(e)
+
+def count_results(results) -> int:
+    """Number of real hits, ignoring the "no good result" placeholder."""
+    if not isinstance(results, list):
+        return 0
+    return sum(1 for item in results if isinstance(item, dict) and item.get("link"))
+
+class EvidenceCache:
+    """TTL + LRU cache of raw search results keyed on the normalized query."""
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, query: str, num_results: int) -> Optional[list]:
+        key = normalize_claim(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                results, fetched, stored_at = entry
+                fresh = time.time() - stored_at <= self.ttl_seconds
+                # A short result list is complete for any size once it came from a full-page fetch.
+                if fresh and (fetched >= num_results or len(results) < fetched):
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return list(results[:num_results])
+                if not fresh:
+                    del self._entries[key]
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, query: str, num_results: int, results: list):
+        key = normalize_claim(query)
+        with self._lock:
+            self._entries[key] = (list(results), num_results, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+_evidence_cache: Optional[EvidenceCache] = None
+
+def ensure_evidence_cache() -> EvidenceCache:
+    global _evidence_cache
+    if _evidence_cache is not None:
+        return _evidence_cache
+    try:
+        max_entries = int(os.getenv("SEARCH_CACHE_SIZE", "2048"))
+        ttl_seconds = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+    except ValueError:
+        raise RuntimeError("SEARCH_CACHE_SIZE and SEARCH_CACHE_TTL must be numbers if set.")
+    _evidence_cache = EvidenceCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+    return _evidence_cache
+
+def _merge(fetched: list, local: list) -> list:
+    """Google results first, then local hits for pages Google did not return."""
+    if not local:
+        return fetched
+    # Drops the "no good result" placeholder, which would only mislead the model next to real hits.
+    fetched = [item for item in fetched if isinstance(item, dict) and item.get("link")]
+    seen = {url_key(item["link"]) for item in fetched}
+    return fetched + [hit for hit in local if url_key(hit["link"]) not in seen]
+
+async def _afetch(query: str, num_results: int) -> list:
+    api_key, cse_id = _credentials()
+    client = ensure_async_client()
+    # The key goes in a header so it never appears in the URL that httpx puts in its error messages.
+    response = await client.get(
+        GOOGLE_CSE_URL,
+        params={"cx": cse_id, "q": query, "num": min(num_results, 10)},
+        headers={"X-goog-api-key": api_key},
+    )
+    response.raise_for_status()
+    return _to_results(response.json().get("items", []))
+
+async def _agoogle(query: str, num_results: int) -> list:
+    cache = ensure_evidence_cache()
+    cached = cache.get(query, num_results)
+    if cached is not None:
+        return cached
+    fetch_size = max(num_results, FETCH_SIZE)
+    fetched = await _afetch(query, fetch_size)
+    cache.set(query, fetch_size, fetched)
+    corpus = await aensure_corpus()
+    if corpus is not None:
+        await run_blocking(corpus.add, fetched)
+    return list(fetched[:num_results])
+
+async def aresults(query: str, num_results: int) -> list:
+    """Hybrid search: strong local corpus hits answer without calling Google; otherwise
+    Google results (cached) are merged with whatever the corpus found."""
+    corpus = await aensure_corpus()
+    local = await run_blocking(corpus.search, query, num_results) if corpus is not None else []
+    if local and corpus.sufficient(local):
+        print(f"   Answered from the local evidence corpus ({len(local)} hits).")
+        return local
+    return _merge(await _agoogle(query, num_results), local)
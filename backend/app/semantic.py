@@ -0,0 +1,321 @@
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional
+from .cache import cache_key, ensure_result_cache, normalize_claim
+from .concurrency import build_once
+from .search import ensure_evidence_cache
+
+# NumPy is imported on first use, so servers that leave SEMANTIC_CACHE off never load it.
+np = None
+
+def _load_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("SEMANTIC_CACHE needs NumPy. Run: pip install numpy")
+        np = numpy
+    return np
+
+_NEGATIONS = frozenset("not no never none nobody nothing isnt wasnt arent werent didnt doesnt dont hasnt havent wont cannot cant hindi wala walang huwag".split())
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_CAPITALIZED = re.compile(r"\b[A-Z][\w'’-]*")
+# Capitalized only because they start a sentence or a question; not names.
+_NOT_NAMES = frozenset("the a an is are was were it its this that these those there did does do has have had "
+                       "in on at of for breaking according totoo ba ang si ni mga sa".split())
+
+def _negated(claim: str) -> bool:
+    """Odd number of negation words; "X is dead" and "X is not dead" must never share a verdict."""
+    words = (normalize_claim(claim) + " ").replace(" t ", "t ").split()
+    return sum(word in _NEGATIONS for word in words) % 2 == 1
+
+def _names(claim: str) -> set:
+    return {word.lower().strip("'’-") for word in _CAPITALIZED.findall(claim)} - _NOT_NAMES
+
+def _same_specifics(claim: str, other: str) -> bool:
+    """Same numbers, and every capitalized name of each claim appears in the other.
+
+    Similar wording is not enough: "Bong Go was arrested" and "Bato dela Rosa was arrested",
+    or the same figure for 2023 and 2024, must not share a verdict or search results.
+    Names are matched against the other claim's words, so an all-lowercase rewording still matches.
+    """
+    if set(_NUMBER.findall(claim)) != set(_NUMBER.findall(other)):
+        return False
+    words, other_words = set(normalize_claim(claim).split()), set(normalize_claim(other).split())
+    return _names(claim) <= other_words and _names(other) <= words
+
+class HashedTfidfEmbedder:
+    """Dependency-light fallback: word and character-trigram counts hashed into a fixed-size vector.
+
+    IDF weights are applied at query time from the index's document frequencies.
+    """
+    uses_idf = True
+    # Rewordings of a claim typically score 0.5-0.7 with these vectors, no higher than claims about
+    # another person or place; only near-identical wordings reuse anything.
+    default_thresholds = (0.9, 0.8)
+
+    def __init__(self, dim: int = 2048):
+        _load_numpy()
+        self.dim = dim
+        self.name = f"hashed-tfidf-{dim}"
+
+    def _features(self, text: str) -> list:
+        words = normalize_claim(text).split()
+        features = list(words)
+        features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"<{word}>"
+            features += [f"#{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, text: str):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            # crc32 rather than hash(): bucket ids must be stable across processes for persistence.
+            vector[zlib.crc32(feature.encode("utf-8")) % self.dim] += 1.0
+        return np.log1p(vector)
+
+class SentenceTransformerEmbedder:
+    """Small CPU-only sentence embedding model, used when SEMANTIC_EMBEDDING_MODEL is set."""
+    uses_idf = False
+    default_thresholds = (0.92, 0.8)
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        _load_numpy()
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self._model.get_sentence_embedding_dimension()
+        self.name = model_name
+
+    def embed(self, text: str):
+        return self._model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+class SemanticIndex:
+    """Append-only embedding index of checked claims with vectorized cosine search.
+
+    Persisted as ``meta.json``, raw float32 rows in ``vectors.f32`` and one JSON entry per line in
+    ``entries.jsonl``; inserts append to both files, so nothing is rewritten as the index grows.
+    Verdicts older than ``verdict_ttl`` and evidence older than ``evidence_ttl`` are not reused.
+    A claim recomputed after it expired keeps its row: the new entry is appended to
+    ``entries.jsonl`` as an update of that row, and updates are folded in on the next load.
+    """
+
+    def __init__(self, embedder, path: Optional[str] = None,
+                 verdict_threshold: float = 0.9, evidence_threshold: float = 0.75,
+                 verdict_ttl: float = 6 * 3600, evidence_ttl: float = 3600):
+        self.embedder = embedder
+        self.verdict_threshold = verdict_threshold
+        self.evidence_threshold = evidence_threshold
+        self.verdict_ttl = verdict_ttl
+        self.evidence_ttl = evidence_ttl
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        _load_numpy()
+        self._vectors = np.zeros((64, embedder.dim), dtype=np.float32)
+        self._doc_freq = np.zeros(embedder.dim, dtype=np.float32)
+        self._entries = []
+        # Row of each (engine, model, normalized claim), so a recomputed claim updates its row.
+        self._positions = {}
+        self._stats = {"verdict_hits": 0, "evidence_hits": 0, "misses": 0}
+        if self.path is not None:
+            self._load()
+
+    def _files(self):
+        return self.path / "meta.json", self.path / "vectors.f32", self.path / "entries.jsonl"
+
+    def _load(self):
+        meta_file, vectors_file, entries_file = self._files()
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta = {"embedder": self.embedder.name, "dim": self.embedder.dim}
+        if meta_file.exists() and json.loads(meta_file.read_text(encoding="utf-8")) != meta:
+            print(f"⚠️  Semantic index at {self.path} was built with another embedder; starting a new one.")
+            vectors_file.unlink(missing_ok=True)
+            entries_file.unlink(missing_ok=True)
+        meta_file.write_text(json.dumps(meta), encoding="utf-8")
+        if not (vectors_file.exists() and entries_file.exists()):
+            return
+        vectors = np.fromfile(vectors_file, dtype=np.float32)
+        rows = len(vectors) // self.embedder.dim
+        with entries_file.open(encoding="utf-8") as handle:
+            lines = [json.loads(line) for line in handle if line.strip()]
+        entries = [line for line in lines if "replaces" not in line]
+        # A crash between the two appends can leave one file a row ahead; trim both to match.
+        count = min(rows, len(entries))
+        entries = entries[:count]
+        for update in (line for line in lines if "replaces" in line):
+            position = update.pop("replaces")
+            if position < count:
+                entries[position] = update
+        # Indexes written before rows were updated in place can hold the same claim twice; keep the newest.
+        latest = {cache_key(entry["engine"], entry["model"], entry["claim"]): i for i, entry in enumerate(entries)}
+        keep = sorted(latest.values())
+        aligned = len(vectors) == count * self.embedder.dim
+        vectors = vectors[: count * self.embedder.dim].reshape(count, self.embedder.dim)
+        for i in keep:
+            self._append(vectors[i], entries[i])
+        if not aligned or len(keep) != len(lines):
+            self._rewrite()
+
+    def _rewrite(self):
+        """Replace both files with the in-memory rows (on load, after trimming or folding in updates)."""
+        _, vectors_file, entries_file = self._files()
+        vectors_tmp = vectors_file.with_suffix(".f32.tmp")
+        entries_tmp = entries_file.with_suffix(".jsonl.tmp")
+        self._vectors[: len(self._entries)].tofile(vectors_tmp)
+        entries_tmp.write_text("".join(json.dumps(entry) + "\n" for entry in self._entries), encoding="utf-8")
+        os.replace(vectors_tmp, vectors_file)
+        os.replace(entries_tmp, entries_file)
+
+    def _append(self, vector, entry: dict):
+        size = len(self._entries)
+        if size == len(self._vectors):
+            self._vectors = np.concatenate([self._vectors, np.zeros_like(self._vectors)])
+        self._vectors[size] = vector
+        self._doc_freq += vector > 0
+        self._entries.append(entry)
+        self._positions[cache_key(entry["engine"], entry["model"], entry["claim"])] = size
+
+    def _similarities(self, query):
+        matrix = self._vectors[: len(self._entries)]
+        if self.embedder.uses_idf:
+            idf = np.log((1.0 + len(self._entries)) / (1.0 + self._doc_freq)) + 1.0
+            matrix = matrix * idf
+            query = query * idf
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+        return (matrix @ query) / np.where(norms == 0, 1.0, norms)
+
+    def lookup(self, claim: str, engine: str, model: str):
+        """Return ``(verdict_match, evidence_match)`` for the closest previously checked claims.
+
+        A verdict match is a prior result from the same engine and model above the verdict
+        threshold and younger than ``verdict_ttl``; an evidence match is any prior claim above
+        the evidence threshold that kept its search results and is younger than ``evidence_ttl``.
+        Either must name the same people, places and numbers (see :func:`_same_specifics`).
+        """
+        query = self.embedder.embed(claim)
+        negated = _negated(claim)
+        now = time.time()
+        with self._lock:
+            if not self._entries:
+                self._stats["misses"] += 1
+                return None, None
+            scores = self._similarities(query)
+            verdict = evidence = None
+            for position in np.argsort(-scores):
+                score = float(scores[position])
+                if score < self.evidence_threshold:
+                    break
+                entry = self._entries[position]
+                if not _same_specifics(claim, entry["claim"]):
+                    continue
+                age = now - entry.get("stored_at", 0.0)
+                if verdict is None and score >= self.verdict_threshold and age <= self.verdict_ttl \
+                        and entry["engine"] == engine and entry["model"] == model \
+                        and _negated(entry["claim"]) == negated:
+                    verdict = {**entry, "score": score}
+                if evidence is None and entry.get("search_results") and age <= self.evidence_ttl:
+                    evidence = {**entry, "score": score}
+                if verdict is not None and evidence is not None:
+                    break
+            if verdict is not None:
+                self._stats["verdict_hits"] += 1
+            elif evidence is not None:
+                self._stats["evidence_hits"] += 1
+            else:
+                self._stats["misses"] += 1
+            return verdict, evidence
+
+    def add(self, claim: str, engine: str, model: str, result: dict, search_results=None):
+        """Index a fresh result; a claim already in the index has its row updated instead."""
+        vector = self.embedder.embed(claim)
+        entry = {
+            "claim": claim,
+            "engine": engine,
+            "model": model,
+            "result": result,
+            "search_results": search_results if isinstance(search_results, list) else None,
+            "stored_at": time.time(),
+        }
+        with self._lock:
+            position = self._positions.get(cache_key(engine, model, claim))
+            if position is not None:
+                self._entries[position] = entry
+                line = {**entry, "replaces": position}
+            else:
+                self._append(vector, entry)
+                line = entry
+            if self.path is not None:
+                _, vectors_file, entries_file = self._files()
+                if position is None:
+                    with vectors_file.open("ab") as handle:
+                        handle.write(vector.astype(np.float32).tobytes())
+                with entries_file.open("a", encoding="utf-8") as handle:
+                    handle.write(json.dumps(line) + "\n")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "enabled": True,
+                "entries": len(self._entries),
+                "embedder": self.embedder.name,
+                "verdict_threshold": self.verdict_threshold,
+                "evidence_threshold": self.evidence_threshold,
+                "verdict_ttl_seconds": self.verdict_ttl,
+                "evidence_ttl_seconds": self.evidence_ttl,
+                "path": str(self.path) if self.path else None,
+            }
+
+_index: Optional[SemanticIndex] = None
+
+def semantic_index_enabled() -> bool:
+    return os.getenv("SEMANTIC_CACHE", "0").lower() in ("1", "true", "yes")
+
+def ensure_semantic_index() -> Optional[SemanticIndex]:
+    """The process-wide index, or None when SEMANTIC_CACHE is off."""
+    global _index
+    if _index is not None or not semantic_index_enabled():
+        return _index
+    _load_numpy()
+    try:
+        dim = int(os.getenv("SEMANTIC_HASH_DIM", "2048"))
+    except ValueError:
+        raise RuntimeError("SEMANTIC_HASH_DIM must be an integer if set.")
+    model_name = os.getenv("SEMANTIC_EMBEDDING_MODEL")
+    embedder = None
+    if model_name:
+        try:
+            embedder = SentenceTransformerEmbedder(model_name)
+        except Exception as e:
+            print(f"⚠️  Could not load embedding model '{model_name}' ({e}); using hashed TF-IDF vectors.")
+    embedder = embedder or HashedTfidfEmbedder(dim)
+    default_verdict, default_evidence = embedder.default_thresholds
+    try:
+        verdict_threshold = float(os.getenv("SEMANTIC_VERDICT_THRESHOLD", str(default_verdict)))
+        evidence_threshold = float(os.getenv("SEMANTIC_EVIDENCE_THRESHOLD", str(default_evidence)))
+    except ValueError:
+        raise RuntimeError("SEMANTIC_VERDICT_THRESHOLD and SEMANTIC_EVIDENCE_THRESHOLD must be numbers if set.")
+    _index = SemanticIndex(
+        embedder,
+        path=os.getenv("SEMANTIC_INDEX_PATH") or None,
+        verdict_threshold=verdict_threshold,
+        evidence_threshold=min(evidence_threshold, verdict_threshold),
+        # Same freshness as the exact-match caches, so RESULT_CACHE_TTL/SEARCH_CACHE_TTL bound reuse here too.
+        verdict_ttl=ensure_result_cache().ttl_seconds,
+        evidence_ttl=ensure_evidence_cache().ttl_seconds,
+    )
+    return _index
+
+async def aensure_semantic_index() -> Optional[SemanticIndex]:
+    """:func:`ensure_semantic_index` for coroutines: the first build, which may load an embedding
+    model or replay a saved index, runs on the worker pool."""
+    if _index is not None or not semantic_index_enabled():
+        return _index
+    return await build_once(ensure_semantic_index)
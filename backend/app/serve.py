@@ -0,0 +1,54 @@
+"""Production entry point: several uvicorn worker processes sharing one verdict cache.
+
+Run from the ``backend`` folder::
+
+    python -m app.serve --workers 4 --port 8000
+
+Each worker has its own engines, admission queues and in-memory caches. They share the
+SQLite file in ``RESULT_CACHE_DB`` (default ``juansource-cache.db`` in multi-worker mode).
+A verdict computed by any worker is served from that file by all the others, and a lease
+table in it makes sure only one worker computes a claim that several are asked at once.
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+from dotenv import load_dotenv, find_dotenv
+
+# Folders written by an append-only, single-process index; two workers would corrupt them.
+_SINGLE_WRITER_PATHS = ("EVIDENCE_CORPUS_PATH", "SEMANTIC_INDEX_PATH")
+
+def default_workers() -> int:
+    try:
+        return max(1, int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 1))))
+    except ValueError:
+        raise RuntimeError("SERVER_WORKERS must be an integer if set.")
+
+def main(argv=None) -> int:
+    load_dotenv(find_dotenv(usecwd=True) or Path(__file__).resolve().parents[2] / ".env")
+    parser = argparse.ArgumentParser(description="Serve the JuanSource API with several worker processes.")
+    parser.add_argument("--workers", type=int, default=default_workers(),
+                        help="worker processes (default: SERVER_WORKERS or the CPU count)")
+    parser.add_argument("--host", default=os.getenv("SERVER_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVER_PORT", "8000")))
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if args.workers > 1:
+        in_use = [name for name in _SINGLE_WRITER_PATHS if os.getenv(name)]
+        if in_use:
+            print(f"{' and '.join(in_use)} can only be written by one process; unset it or run with --workers 1.")
+            return 1
+        if not os.getenv("RESULT_CACHE_DB"):
+            # Workers inherit the environment, so they all open the same file.
+            os.environ["RESULT_CACHE_DB"] = "juansource-cache.db"
+        print(f"Starting {args.workers} workers sharing the verdict cache in {os.environ['RESULT_CACHE_DB']}.")
+        print("   LLM concurrency limits (<ENGINE>_LLM_CONCURRENCY) apply per worker.")
+
+    import uvicorn
+    uvicorn.run("app.main:app", host=args.host, port=args.port, workers=args.workers)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
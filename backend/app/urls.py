@@ -0,0 +1,15 @@
+"""URL normalisation shared by evidence packing, the corpus, the cascade and history."""
+from urllib.parse import urlparse
+
+def domain(url: str) -> str:
+    """Lowercased host without a leading ``www.``."""
+    host = urlparse(url.strip()).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+def url_key(url: str) -> str:
+    """Identity of a page for de-duplication: scheme, ``www.``, case, fragment and a trailing
+    slash are ignored; the query string is kept."""
+    parsed = urlparse(url.strip().lower())
+    host = parsed.netloc[4:] if parsed.netloc.startswith("www.") else parsed.netloc
+    key = host + parsed.path.rstrip("/")
+    return f"{key}?{parsed.query}" if parsed.query else key
@@ -0,0 +1,96 @@
+"""Local stand-ins for Google Custom Search and the chat models, with configurable latency.
+
+``install`` swaps them into both engines so the FastAPI app can be exercised without
+API keys, network access or a running model.
+"""
+import asyncio
+import re
+import time
+import zlib
+from pathlib import Path
+from types import SimpleNamespace
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus" / "parser"
+
+_TOKEN = re.compile(r"\s*\S+")
+
+class FakeGoogleSearch:
+    """Mimics ``GoogleSearchAPIWrapper.results`` with result snippets built from the query."""
+
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+        self.calls = 0
+
+    def _items(self, query: str, num_results: int) -> list:
+        return [
+            {
+                "title": f"Report {rank + 1} on {query[:60]}",
+                "link": f"https://news{rank % 4}.example.com/{rank}/{zlib.crc32(query.encode()) % 100000}",
+                "snippet": f"Coverage of {query} from source {rank + 1}, with officials quoted on the details "
+                           f"and dates involved. Item {rank + 1} adds background that other outlets omit.",
+            }
+            for rank in range(min(num_results, 10))
+        ]
+
+    def results(self, query: str, num_results: int = 10) -> list:
+        self.calls += 1
+        time.sleep(self.latency)
+        return self._items(query, num_results)
+
+    async def afetch(self, query: str, num_results: int) -> list:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return self._items(query, num_results)
+
+class FakeChatModel:
+    """Replies with a canned fact-check after ``first_token_latency``, then streams at ``tokens_per_second``."""
+
+    def __init__(self, output: str, first_token_latency: float = 0.3, tokens_per_second: float = 40.0):
+        self.output = output
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.calls = 0
+
+    def _tokens(self) -> list:
+        return _TOKEN.findall(self.output)
+
+    def _generation_time(self) -> float:
+        return self.first_token_latency + len(self._tokens()) / self.tokens_per_second
+
+    def invoke(self, prompt: str):
+        self.calls += 1
+        time.sleep(self._generation_time())
+        return SimpleNamespace(content=self.output)
+
+    async def ainvoke(self, prompt: str):
+        self.calls += 1
+        await asyncio.sleep(self._generation_time())
+        return SimpleNamespace(content=self.output)
+
+    async def astream(self, prompt: str):
+        self.calls += 1
+        await asyncio.sleep(self.first_token_latency)
+        delay = 1.0 / self.tokens_per_second
+        for token in self._tokens():
+            yield SimpleNamespace(content=token)
+            await asyncio.sleep(delay)
+
+def canned_output(engine: str) -> str:
+    name = "09_gemini_style.txt" if engine == "gemini" else "01_clean_format.txt"
+    return (CORPUS_DIR / name).read_text(encoding="utf-8").strip()
+
+def install(search_latency: float, first_token_latency: float, tokens_per_second: float) -> dict:
+    """Point both engines and the shared search module at fakes; returns them by name."""
+    from app import fact_checker, fact_checkerOLLAMA
+    from app import search as search_client
+    from app.ollama_pool import OllamaPool
+
+    search = FakeGoogleSearch(search_latency)
+    models = {
+        engine: FakeChatModel(canned_output(engine), first_token_latency, tokens_per_second)
+        for engine in ("gemini", "ollama")
+    }
+    search_client._afetch = search.afetch
+    fact_checker._llm = models["gemini"]
+    fact_checkerOLLAMA._pool = OllamaPool(["http://fake-ollama:11434"], lambda base_url, model: models["ollama"])
+    return {"search": search, **models}
@@ -0,0 +1,164 @@
+"""Parsers as they were before ``app.parsing``; kept only so the benchmark can check parity."""
+import re
+
+def _extract_section(text: str, label: str) -> str:
+    pattern = re.compile(rf"{label}\s*(.*?)(?=\n[A-Z][a-zA-Z]+:|$)", re.IGNORECASE | re.DOTALL)
+    match = pattern.search(text)
+    return match.group(1).strip() if match else ""
+
+def _normalise_classification(value: str) -> str:
+    lowered = (value or "").lower()
+    if any(token in lowered for token in ["real", "true", "verified"]):
+        return "real"
+    if any(token in lowered for token in ["fake", "false", "hoax"]):
+        return "fake"
+    return "unknown"
+
+def parse_ollama(raw: str):
+    classification = _extract_section(raw, "Classification:")
+    reasoning = _extract_section(raw, "Reasoning:")
+    evidence_block = _extract_section(raw, "Evidence:")
+    evidence = re.findall(r"https?://[^\s\"')]+", evidence_block or "")
+    
+    # Validate and fix citation numbers in reasoning if they exceed available sources
+    if reasoning and evidence:
+        max_citation = len(evidence)
+        # Find all citation references like [1], [2], [5], etc.
+        citation_pattern = re.compile(r'\[(\d+)\]')
+        citations_found = citation_pattern.findall(reasoning)
+        
+        if citations_found:
+            max_citation_in_text = max(int(c) for c in citations_found)
+            if max_citation_in_text > max_citation:
+                print(f"   ⚠️  Warning: Reasoning references citation [{max_citation_in_text}] but only {max_citation} sources available. Citations may be incorrect.")
+    
+    # Clean up reasoning: remove any evidence/URL sections that might be embedded
+    # The LLM sometimes includes the Evidence section in the Reasoning output
+    if reasoning:
+        # Remove everything from "**Evidence:**" onwards, including the entire array block
+        # This pattern matches: **Evidence:** followed by optional whitespace, then [ and everything until the end
+        evidence_pattern = re.compile(
+            r'\*\*?EVIDENCE\*\*?:?\s*\[.*?\]\s*$',
+            re.IGNORECASE | re.DOTALL
+        )
+        reasoning = evidence_pattern.sub('', reasoning)
+        
+        # Also handle plain "Evidence:" format
+        evidence_pattern2 = re.compile(
+            r'EVIDENCE:?\s*\[.*?\]\s*$',
+            re.IGNORECASE | re.DOTALL
+        )
+        reasoning = evidence_pattern2.sub('', reasoning)
+        
+        # Remove "**Evidence:**" or "Evidence:" markers even without arrays (fallback)
+        evidence_pattern3 = re.compile(
+            r'\*\*?EVIDENCE\*\*?:?\s*.*$',
+            re.IGNORECASE | re.DOTALL
+        )
+        reasoning = evidence_pattern3.sub('', reasoning)
+        
+        # Now clean line by line to remove any remaining evidence artifacts
+        lines = reasoning.split('\n')
+        cleaned_lines = []
+        in_evidence_section = False
+        bracket_count = 0
+        consecutive_stars = 0
+        
+        for i, line in enumerate(lines):
+            # Detect start of evidence section - various formats
+            if re.search(r'\*\*?EVIDENCE\*\*?:?', line, re.IGNORECASE):
+                in_evidence_section = True
+                bracket_count = 0
+                continue
+            
+            if re.search(r'^\s*EVIDENCE:?\s*$', line, re.IGNORECASE):
+                in_evidence_section = True
+                bracket_count = 0
+                continue
+            
+            # Detect lines with multiple asterisks (like ****) that might indicate evidence section
+            star_count = line.count('*')
+            if star_count >= 3 and not in_evidence_section:
+                # Check if next lines contain URLs - if so, this is likely an evidence marker
+                lookahead = '\n'.join(lines[i+1:min(i+5, len(lines))])
+                if re.search(r'https?://', lookahead):
+                    in_evidence_section = True
+                    bracket_count = 0
+                    continue
+            
+            # If we're in an evidence section, track brackets and URLs
+            if in_evidence_section:
+                # Count brackets to know when array ends
+                bracket_count += line.count('[')
+                bracket_count -= line.count(']')
+                
+                # Check if this line contains a URL (quoted or not)
+                has_url = bool(re.search(r'https?://', line))
+                # Check if this line is just asterisks or whitespace
+                is_asterisk_line = re.match(r'^\s*\*+\s*$', line)
+                
+                # Skip this line if it's part of the evidence array/URLs
+                if bracket_count > 0:
+                    continue
+                elif has_url or is_asterisk_line:
+                    # Still in evidence section, skip this line
+                    continue
+                elif bracket_count == 0 and ']' in line:
+                    # Array closed, we're done with evidence section
+                    in_evidence_section = False
+                    bracket_count = 0
+                    continue
+                elif not has_url and not is_asterisk_line and bracket_count == 0:
+                    # No more URLs or brackets, might be done with evidence section
+                    # But check if next line has URL
+                    if i + 1 < len(lines):
+                        next_line = lines[i + 1]
+                        if not re.search(r'https?://', next_line):
+                            in_evidence_section = False
+                            bracket_count = 0
+                    else:
+                        in_evidence_section = False
+                        bracket_count = 0
+                    continue
+            
+            # Skip standalone URLs (not in evidence section but shouldn't be in reasoning)
+            if re.match(r'^\s*https?://', line):
+                continue
+            if re.match(r'^\s*\d+\.\s*["\']?https?://', line):
+                continue
+            # Skip array brackets that might be standalone
+            if re.match(r'^\s*[\[\]]\s*$', line):
+                continue
+            # Skip lines with only asterisks
+            if re.match(r'^\s*\*+\s*$', line):
+                continue
+            # Skip quoted URLs that might be standalone
+            if re.match(r'^\s*["\']https?://', line):
+                continue
+            
+            cleaned_lines.append(line)
+        
+        reasoning = '\n'.join(cleaned_lines).strip()
+        
+        # Final cleanup: remove any remaining evidence markers or trailing brackets
+        reasoning = re.sub(r'\*\*?EVIDENCE\*\*?:?\s*', '', reasoning, flags=re.IGNORECASE)
+        reasoning = re.sub(r'EVIDENCE:?\s*', '', reasoning, flags=re.IGNORECASE)
+        reasoning = re.sub(r'\s*\[\s*\]\s*$', '', reasoning)  # Remove trailing empty arrays
+        reasoning = re.sub(r'\s*\[\s*$', '', reasoning)  # Remove trailing opening bracket
+        # Remove trailing asterisks
+        reasoning = re.sub(r'\s*\*+\s*$', '', reasoning)
+        # Remove any trailing quoted URLs
+        reasoning = re.sub(r'\s*["\']https?://[^\s"\']+["\']\s*,?\s*$', '', reasoning, flags=re.MULTILINE)
+        
+        # Remove leading markdown bold markers (**) from the start of the text
+        reasoning = re.sub(r'^\s*\*\*\s*', '', reasoning)  # Remove ** at the start
+        reasoning = re.sub(r'^\s*\*\s*', '', reasoning)  # Remove single * at the start (fallback)
+    
+    return _normalise_classification(classification), reasoning or raw.strip(), evidence
+
+def parse_gemini(raw: str):
+    classification = _extract_section(raw, "Classification:")
+    reasoning = _extract_section(raw, "Reasoning:")
+    evidence_block = _extract_section(raw, "Evidence:")
+    evidence = re.findall(r"https?://[^\s\"')]+", evidence_block or "")
+    return _normalise_classification(classification), reasoning or raw.strip(), evidence
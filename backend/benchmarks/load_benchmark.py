@@ -0,0 +1,177 @@
+"""Offline load test of ``/fact-check`` and ``/fact-check-ollama`` with fake search and models.
+
+Run from the ``backend`` folder::
+
+    python -m benchmarks.load_benchmark [--requests 200] [--concurrency 16] [--json load.json]
+
+The FastAPI app is driven in-process; Google Custom Search and both chat models are
+replaced by the stand-ins in ``benchmarks.fakes``, so no keys or network are needed.
+Per endpoint it reports p50/p95/p99 latency, requests/sec, and the CPU time spent
+building prompts and parsing model output. ``--compare`` prints the change against a
+previous ``--json`` file, e.g. one produced on another commit.
+"""
+import os
+
+# Must be set before the app is imported: no warm-up, no stage logs, no persistent state.
+os.environ["OLLAMA_WARMUP"] = "0"
+os.environ["STAGE_LOGS"] = "0"
+os.environ["SEMANTIC_CACHE"] = "0"
+os.environ["RESULT_CACHE_DB"] = ""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from app import metrics
+from app.main import app
+from benchmarks import fakes
+
+ENDPOINTS = {"/fact-check": "gemini", "/fact-check-ollama": "ollama"}
+
+CLAIMS = (
+    "DepEd moves the opening of classes to June 16",
+    "PAGASA says a super typhoon will hit Metro Manila this week",
+    "The Senate approved a law banning motorcycles on EDSA",
+    "Inflation in the Philippines fell to 2.1 percent in June",
+    "Rice will be sold at 20 pesos per kilo nationwide starting next month",
+)
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+def _stage_totals(engine: str) -> dict:
+    totals = {}
+    for stage in ("prompt_build", "parse"):
+        count = total = 0.0
+        for (series_engine, _), (series_count, series_sum) in metrics.STAGES[stage].totals().items():
+            if series_engine == engine:
+                count += series_count
+                total += series_sum
+        totals[stage] = (count, total)
+    return totals
+
+def claims_for(endpoint: str, requests: int, distinct: int) -> list:
+    # Tagged per endpoint so one run never warms the search cache for the next.
+    return [f"{CLAIMS[i % len(CLAIMS)]} ({endpoint.strip('/')} {i % distinct})" for i in range(requests)]
+
+async def run_endpoint(client: httpx.AsyncClient, endpoint: str, claims: list, concurrency: int) -> dict:
+    engine = ENDPOINTS[endpoint]
+    latencies, failures = [], 0
+    queue = list(reversed(claims))
+
+    async def worker():
+        nonlocal failures
+        while queue:
+            claim = queue.pop()
+            start = time.perf_counter()
+            response = await client.post(endpoint, json={"claim": claim})
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                failures += 1
+
+    before = _stage_totals(engine)
+    cpu_before = time.process_time()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_before
+    after = _stage_totals(engine)
+
+    def per_call_ms(stage):
+        count = after[stage][0] - before[stage][0]
+        return round((after[stage][1] - before[stage][1]) / count * 1000, 3) if count else None
+
+    return {
+        "endpoint": endpoint,
+        "requests": len(claims),
+        "failures": failures,
+        "requests_per_second": round(len(claims) / wall, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "prompt_build_ms": per_call_ms("prompt_build"),
+        "parse_ms": per_call_ms("parse"),
+        "process_cpu_ms_per_request": round(cpu / len(claims) * 1000, 3),
+    }
+
+async def run(args) -> list:
+    fakes.install(args.search_latency, args.first_token_latency, args.tokens_per_second)
+    transport = httpx.ASGITransport(app=app)
+    rows = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        for endpoint in ENDPOINTS:
+            claims = claims_for(endpoint, args.requests, args.distinct or args.requests)
+            # The engines print progress for every request; keep the report readable.
+            with contextlib.redirect_stdout(io.StringIO()):
+                rows.append(await run_endpoint(client, endpoint, claims, args.concurrency))
+    return rows
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def print_report(rows: list, baseline: dict = None):
+    print(f"{'endpoint':<20}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'prompt ms':>11}{'parse ms':>10}{'fail':>6}")
+    for row in rows:
+        print(
+            f"{row['endpoint']:<20}{row['requests_per_second']:>9}{row['p50_ms']:>9}{row['p95_ms']:>9}"
+            f"{row['p99_ms']:>9}{row['prompt_build_ms']!s:>11}{row['parse_ms']!s:>10}{row['failures']:>6}"
+        )
+    if not baseline:
+        return
+    previous = {row["endpoint"]: row for row in baseline.get("results", [])}
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for row in rows:
+        old = previous.get(row["endpoint"])
+        if old is None:
+            continue
+        changes = []
+        for key in ("requests_per_second", "p95_ms", "prompt_build_ms", "parse_ms"):
+            if old.get(key) and row.get(key) is not None:
+                changes.append(f"{key} {(row[key] - old[key]) / old[key] * 100:+.1f}%")
+        print(f"  {row['endpoint']:<20}" + ", ".join(changes))
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight at once")
+    parser.add_argument("--distinct", type=int, default=0,
+                        help="distinct claims per endpoint (default: every request is new, so caches miss)")
+    parser.add_argument("--search-latency", type=float, default=0.2, help="seconds per fake search")
+    parser.add_argument("--first-token-latency", type=float, default=0.3, help="seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="fake model generation rate")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="earlier --json output to compare against")
+    args = parser.parse_args(argv)
+    if args.requests < 1 or args.concurrency < 1:
+        parser.error("--requests and --concurrency must be at least 1")
+
+    rows = asyncio.run(run(args))
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+    print_report(rows, baseline)
+    if args.json:
+        report = {
+            "commit": _git_commit(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("json", "compare")},
+            "results": rows,
+        }
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 1 if any(row["failures"] for row in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Parity check and micro-benchmark for ``app.parsing`` against the legacy parsers.
+
+Run from the ``backend`` folder::
+
+    python -m benchmarks.parser_benchmark [--repeat 200] [--json results.json]
+
+Every output in ``corpus/parser`` (plus synthetic long outputs built from the same
+artifacts) must parse identically with the new and the legacy implementation; the
+script exits non-zero otherwise.
+"""
+import argparse
+import contextlib
+import io
+import json
+import sys
+import timeit
+from pathlib import Path
+
+from app.parsing import parse_fact_check_output
+from benchmarks import legacy_parser
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus" / "parser"
+
+_SYNTHETIC_BLOCK = (
+    "The agency's statement [1] contradicts the post, and the wire report [2] agrees.\n"
+    "****\n"
+    '1. "https://www.example.gov.ph/advisory"\n'
+    '2. "https://news.example.com/report"\n'
+    "[\n"
+    "]\n"
+)
+
+def load_corpus() -> dict:
+    return {path.name: path.read_text(encoding="utf-8").strip() for path in sorted(CORPUS_DIR.glob("*.txt"))}
+
+def synthetic_output(blocks: int) -> str:
+    return (
+        "Classification: FAKE\nReasoning: "
+        + _SYNTHETIC_BLOCK * blocks
+        + 'Evidence: [\n  "https://www.example.gov.ph/advisory",\n  "https://news.example.com/report"\n]'
+    )
+
+def _quiet(func, raw):
+    # The Ollama parsers print citation warnings; keep them out of the report.
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(raw)
+
+def check_parity(samples: dict) -> list:
+    mismatches = []
+    for name, raw in samples.items():
+        if _quiet(lambda text: parse_fact_check_output(text), raw) != _quiet(legacy_parser.parse_ollama, raw):
+            mismatches.append(f"{name} (ollama)")
+        if parse_fact_check_output(raw, clean=False) != legacy_parser.parse_gemini(raw):
+            mismatches.append(f"{name} (gemini)")
+    return mismatches
+
+def _time_per_call(func, raw: str, repeat: int) -> float:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return min(timeit.repeat(lambda: func(raw), number=repeat, repeat=3)) / repeat
+
+def benchmark(samples: dict, repeat: int) -> list:
+    rows = []
+    for name, raw in samples.items():
+        legacy = _time_per_call(legacy_parser.parse_ollama, raw, repeat)
+        current = _time_per_call(parse_fact_check_output, raw, repeat)
+        rows.append({
+            "sample": name,
+            "chars": len(raw),
+            "legacy_us": round(legacy * 1e6, 2),
+            "new_us": round(current * 1e6, 2),
+            "speedup": round(legacy / current, 2) if current else None,
+        })
+    return rows
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="parses per timing run")
+    parser.add_argument("--json", help="write the timing rows to this file")
+    args = parser.parse_args(argv)
+
+    samples = load_corpus()
+    for blocks in (50, 200):
+        samples[f"synthetic_{blocks}_blocks"] = synthetic_output(blocks)
+
+    mismatches = check_parity(samples)
+    if mismatches:
+        print("Parser output differs from the legacy parser for: " + ", ".join(mismatches))
+        return 1
+    print(f"Parity OK on {len(samples)} samples.")
+
+    rows = benchmark(samples, args.repeat)
+    print(f"{'sample':<36}{'chars':>8}{'legacy µs':>12}{'new µs':>10}{'speedup':>9}")
+    for row in rows:
+        print(f"{row['sample']:<36}{row['chars']:>8}{row['legacy_us']:>12}{row['new_us']:>10}{row['speedup']:>8}x")
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Prompt-eval cost per request for the ``legacy`` and ``system`` prompt layouts.
+
+Run from the ``backend`` folder against a running Ollama server::
+
+    python -m benchmarks.prompt_cache_benchmark [--model llama3.1:8b] [--requests 20] [--json cache.json]
+
+Each layout sends the same claims (with evidence from the fake search in ``benchmarks.fakes``)
+to ``/api/chat`` and reads Ollama's own ``prompt_eval_count`` and ``prompt_eval_duration``:
+tokens served from the KV cache are not counted there, so the difference between the layouts
+is the prompt-eval time the shared prefix saves. The first request of each layout only warms
+the cache and is left out. Generation is capped at one token to isolate prompt processing.
+
+With ``--offline`` no server is needed: it reports how many prompt tokens each request
+shares with the previous one (the prefix a cache can reuse) and converts the difference to
+milliseconds at ``--eval-rate`` tokens per second.
+"""
+import os
+
+# Must be set before the engine is imported: no stage logs.
+os.environ["STAGE_LOGS"] = "0"
+
+import argparse
+import contextlib
+import io
+import json
+import statistics
+import sys
+from pathlib import Path
+
+import httpx
+
+from app import fact_checkerOLLAMA
+from app.evidence import count_tokens
+from app.prompts import LAYOUTS, prompt_text
+from benchmarks.fakes import FakeGoogleSearch
+from benchmarks.load_benchmark import CLAIMS, _git_commit
+
+def build_prompts(layout: str, requests: int, model: str) -> list:
+    os.environ["PROMPT_LAYOUT"] = layout
+    search = FakeGoogleSearch(latency=0)
+    prompts = []
+    for i in range(requests):
+        claim = f"{CLAIMS[i % len(CLAIMS)]} (run {i})"
+        # The engine prints each prompt's size; keep the report readable.
+        with contextlib.redirect_stdout(io.StringIO()):
+            prompts.append(fact_checkerOLLAMA._prepare_prompt(claim, search.results(claim), model))
+    return prompts
+
+def _chat_messages(prompt) -> list:
+    if isinstance(prompt, str):
+        return [{"role": "user", "content": prompt}]
+    return [{"role": "system" if message.type == "system" else "user", "content": message.content} for message in prompt]
+
+def _shared_prefix(left: str, right: str) -> str:
+    size = 0
+    for a, b in zip(left, right):
+        if a != b:
+            break
+        size += 1
+    return left[:size]
+
+def measure_offline(prompts: list, eval_rate: float) -> dict:
+    texts = [prompt_text(prompt) for prompt in prompts]
+    totals = [count_tokens(text) for text in texts[1:]]
+    reused = [count_tokens(_shared_prefix(previous, text)) for previous, text in zip(texts, texts[1:])]
+    evaluated = [total - cached for total, cached in zip(totals, reused)]
+    return {
+        "prompt_tokens": round(statistics.mean(totals), 1),
+        "reusable_prefix_tokens": round(statistics.mean(reused), 1),
+        "evaluated_tokens": round(statistics.mean(evaluated), 1),
+        "prompt_eval_ms": round(statistics.mean(evaluated) / eval_rate * 1000, 1),
+    }
+
+def measure_server(prompts: list, base_url: str, model: str, num_ctx: int) -> dict:
+    evaluated, durations = [], []
+    with httpx.Client(base_url=base_url, timeout=600.0) as client:
+        for i, prompt in enumerate(prompts):
+            response = client.post("/api/chat", json={
+                "model": model,
+                "messages": _chat_messages(prompt),
+                "stream": False,
+                "keep_alive": "10m",
+                "options": {"num_ctx": num_ctx, "num_predict": 1, "temperature": 0},
+            })
+            response.raise_for_status()
+            data = response.json()
+            if i == 0:
+                continue  # fills the cache for this layout
+            evaluated.append(data.get("prompt_eval_count", 0))
+            durations.append(data.get("prompt_eval_duration", 0) / 1e6)
+    return {
+        "prompt_tokens": round(statistics.mean(count_tokens(prompt_text(p)) for p in prompts[1:]), 1),
+        "evaluated_tokens": round(statistics.mean(evaluated), 1),
+        "prompt_eval_ms": round(statistics.mean(durations), 1),
+        "prompt_eval_p95_ms": round(sorted(durations)[max(0, round(0.95 * len(durations)) - 1)], 1),
+    }
+
+def print_report(rows: dict):
+    keys = [key for key in next(iter(rows.values()))]
+    print(f"{'layout':<10}" + "".join(f"{key:>24}" for key in keys))
+    for layout, row in rows.items():
+        print(f"{layout:<10}" + "".join(f"{row[key]!s:>24}" for key in keys))
+    legacy, system = rows["legacy"]["prompt_eval_ms"], rows["system"]["prompt_eval_ms"]
+    if legacy:
+        print(f"\nsystem layout saves {legacy - system:.1f} ms of prompt eval per request ({(legacy - system) / legacy * 100:.0f}%).")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"))
+    parser.add_argument("--model", default=fact_checkerOLLAMA.model_name())
+    parser.add_argument("--requests", type=int, default=20, help="requests per layout (the first only warms the cache)")
+    parser.add_argument("--num-ctx", type=int, default=int(os.getenv("OLLAMA_NUM_CTX") or 4096))
+    parser.add_argument("--offline", action="store_true", help="estimate from shared prompt prefixes, no server needed")
+    parser.add_argument("--eval-rate", type=float, default=300.0,
+                        help="prompt tokens evaluated per second, for --offline estimates")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+    if args.requests < 2:
+        parser.error("--requests must be at least 2")
+
+    rows = {}
+    for layout in LAYOUTS:
+        prompts = build_prompts(layout, args.requests, args.model)
+        if args.offline:
+            rows[layout] = measure_offline(prompts, args.eval_rate)
+        else:
+            try:
+                rows[layout] = measure_server(prompts, args.base_url, args.model, args.num_ctx)
+            except httpx.ConnectError:
+                print(f"No Ollama server at {args.base_url}; start one or run with --offline.")
+                return 1
+    print_report(rows)
+    if args.json:
+        report = {
+            "commit": _git_commit(),
+            "config": {key: value for key, value in vars(args).items() if key != "json"},
+            "results": rows,
+        }
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
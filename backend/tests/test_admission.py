@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.admission import AdmissionController, Overloaded
+
+async def _hold(controller, release, started=None):
+    async with controller.slot():
+        if started is not None:
+            started.append(1)
+        await release.wait()
+
+def test_queue_full_is_429():
+    async def scenario():
+        controller, release = AdmissionController("test", 1, 1, 60.0), asyncio.Event()
+        running = asyncio.ensure_future(_hold(controller, release))
+        queued = asyncio.ensure_future(_hold(controller, release))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as rejected:
+            async with controller.slot():
+                pass
+        release.set()
+        await asyncio.gather(running, queued)
+        return rejected.value, controller.stats()
+
+    error, stats = asyncio.run(scenario())
+    assert error.status_code == 429
+    assert error.retry_after >= 1
+    assert stats["rejected_full"] == 1
+    assert stats["admitted"] == 2
+    assert stats["active"] == 0
+
+def test_estimated_wait_past_deadline_is_503():
+    async def scenario():
+        controller, release = AdmissionController("test", 1, 8, 5.0), asyncio.Event()
+        controller._service_time = 10.0
+        running = asyncio.ensure_future(_hold(controller, release))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as rejected:
+            controller.check()
+        release.set()
+        await running
+        return rejected.value, controller.stats()
+
+    error, stats = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert error.retry_after == 10
+    assert stats["rejected_deadline"] == 1
+
+def test_queued_past_deadline_is_503():
+    async def scenario():
+        controller, release = AdmissionController("test", 1, 8, 0.05), asyncio.Event()
+        running = asyncio.ensure_future(_hold(controller, release))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as timed_out:
+            async with controller.slot():
+                pass
+        stats = controller.stats()
+        release.set()
+        await running
+        return timed_out.value, stats
+
+    error, stats = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert stats["timed_out"] == 1
+    assert stats["waiting"] == 0
+
+def test_cancelled_while_queued_frees_its_place():
+    async def scenario():
+        controller, release, started = AdmissionController("test", 1, 8, 60.0), asyncio.Event(), []
+        running = asyncio.ensure_future(_hold(controller, release, started))
+        cancelled = asyncio.ensure_future(_hold(controller, release, started))
+        after = asyncio.ensure_future(_hold(controller, release, started))
+        await asyncio.sleep(0)
+        assert controller.stats()["waiting"] == 2
+        cancelled.cancel()
+        await asyncio.sleep(0.01)
+        assert controller.stats()["waiting"] == 1
+        release.set()
+        await asyncio.gather(running, after)
+        return cancelled.cancelled(), started, controller.stats()
+
+    was_cancelled, started, stats = asyncio.run(scenario())
+    assert was_cancelled
+    assert len(started) == 2
+    assert stats["active"] == 0
+    assert stats["waiting"] == 0
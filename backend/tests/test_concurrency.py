@@ -0,0 +1,81 @@
+import asyncio
+
+from app.concurrency import SingleFlight
+
+def test_concurrent_callers_share_one_computation():
+    async def scenario():
+        flight, calls, release = SingleFlight(), [], asyncio.Event()
+
+        async def compute():
+            calls.append(1)
+            await release.wait()
+            return "verdict"
+
+        callers = [asyncio.ensure_future(flight.run("claim", compute)) for _ in range(4)]
+        await asyncio.sleep(0)
+        assert flight.stats()["in_flight"] == 1
+        assert flight.stats()["waiters"] == 3
+        release.set()
+        results = await asyncio.gather(*callers)
+        return results, calls, flight.stats()
+
+    results, calls, stats = asyncio.run(scenario())
+    assert results == ["verdict"] * 4
+    assert len(calls) == 1
+    assert stats["leaders"] == 1
+    assert stats["coalesced"] == 3
+    assert stats["peak_waiters"] == 3
+    assert stats["in_flight"] == 0
+    assert stats["waiters"] == 0
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def compute(value):
+            await asyncio.sleep(0)
+            return value
+
+        return await asyncio.gather(flight.run("a", lambda: compute(1)), flight.run("b", lambda: compute(2)))
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    async def scenario():
+        flight, release = SingleFlight(), asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return "verdict"
+
+        leader = asyncio.ensure_future(flight.run("claim", compute))
+        follower = asyncio.ensure_future(flight.run("claim", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        assert flight.stats()["in_flight"] == 1
+        release.set()
+        return leader.cancelled(), await follower, flight.stats()
+
+    leader_cancelled, result, stats = asyncio.run(scenario())
+    assert leader_cancelled
+    assert result == "verdict"
+    assert stats["waiters"] == 0
+
+def test_failure_is_not_cached():
+    async def scenario():
+        flight, attempts = SingleFlight(), []
+
+        async def compute():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("search failed")
+            return "verdict"
+
+        try:
+            await flight.run("claim", compute)
+        except RuntimeError:
+            pass
+        return await flight.run("claim", compute)
+
+    assert asyncio.run(scenario()) == "verdict"
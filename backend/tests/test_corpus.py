@@ -0,0 +1,35 @@
+import time
+
+from app.corpus import EvidenceCorpus
+
+CLAIM = "Typhoon Carina flooded Marikina City"
+
+def _corpus(path, **kwargs):
+    corpus = EvidenceCorpus(str(path), min_score=0.5, min_hits=2, **kwargs)
+    corpus.add([
+        {"title": f"Typhoon Carina flooded Marikina City ({n})", "link": f"https://news.example.com/{n}",
+         "snippet": "Floodwaters rose in Marikina City as Typhoon Carina passed."}
+        for n in range(3)
+    ])
+    return corpus
+
+def test_recent_hits_are_sufficient(tmp_path):
+    corpus = _corpus(tmp_path)
+    hits = corpus.search(CLAIM, 5)
+    assert len(hits) == 3
+    assert corpus.sufficient(hits)
+
+def test_old_hits_are_not_sufficient(tmp_path):
+    corpus = _corpus(tmp_path, max_age=3600)
+    hits = corpus.search(CLAIM, 5)
+    for hit in hits:
+        hit["added_at"] = time.time() - 7200
+    assert not corpus.sufficient(hits)
+    assert corpus.sufficient(hits[:1] + corpus.search(CLAIM, 5)[1:])
+
+def test_no_max_age(tmp_path):
+    corpus = _corpus(tmp_path, max_age=0)
+    hits = corpus.search(CLAIM, 5)
+    for hit in hits:
+        hit["added_at"] = 0.0
+    assert corpus.sufficient(hits)
@@ -0,0 +1,41 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.semantic import HashedTfidfEmbedder, SemanticIndex, _same_specifics
+
+SEARCH_RESULTS = [{"title": "Report", "link": "https://news.example.com/1", "snippet": "..."}]
+
+def _index(*claims):
+    index = SemanticIndex(HashedTfidfEmbedder(), verdict_threshold=0.9, evidence_threshold=0.8)
+    for claim in claims:
+        index.add(claim, "ollama", "m", {"classification": "real"}, SEARCH_RESULTS)
+    return index
+
+def _lookup(index, claim):
+    return index.lookup(claim, "ollama", "m")
+
+def test_rewording_reuses_verdict():
+    index = _index("Senator Bong Go was arrested by the NBI yesterday")
+    verdict, evidence = _lookup(index, "senator bong go was arrested by the NBI yesterday!")
+    assert verdict is not None and evidence is not None
+
+@pytest.mark.parametrize("stored, asked", [
+    ("Senator Bong Go was arrested by the NBI yesterday", "Senator Bato dela Rosa was arrested by the NBI yesterday"),
+    ("A magnitude 6 earthquake hit Davao City today", "A magnitude 6 earthquake hit Cebu City today"),
+    ("Inflation in the Philippines rose to 5.2 percent in March 2024", "Inflation in the Philippines rose to 5.2 percent in March 2023"),
+    ("A magnitude 7 earthquake hit Mindanao this morning", "A magnitude 5 earthquake hit Mindanao this morning"),
+])
+def test_other_names_or_numbers_reuse_nothing(stored, asked):
+    assert _lookup(_index(stored), asked) == (None, None)
+
+def test_same_specifics():
+    assert _same_specifics("Duterte was arrested in Manila", "duterte arrested in manila")
+    assert _same_specifics("The moon is made of cheese", "Moon made of cheese")
+    assert not _same_specifics("Duterte arrested", "Marcos arrested")
+    assert not _same_specifics("Fuel prices rise by 2 pesos", "Fuel prices rise by 3 pesos")
+
+def test_negation_never_shares_a_verdict():
+    verdict, _ = _lookup(_index("Senator Bong Go was arrested by the NBI yesterday"),
+                         "Senator Bong Go was not arrested by the NBI yesterday")
+    assert verdict is None
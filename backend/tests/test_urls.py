@@ -0,0 +1,12 @@
+from app.urls import domain, url_key
+
+def test_domain():
+    assert domain("https://www.Rappler.com/nation/story") == "rappler.com"
+    assert domain("//news.abs-cbn.com") == "news.abs-cbn.com"
+
+def test_url_key_ignores_scheme_www_case_and_trailing_slash():
+    assert url_key("https://www.Example.com/Story/") == url_key("http://example.com/story")
+    assert url_key("https://example.com/story#top") == url_key("https://example.com/story")
+
+def test_url_key_keeps_query():
+    assert url_key("https://example.com/article?id=1") != url_key("https://example.com/article?id=2")